@@ -3,60 +3,29 @@ import discord
 from discord.ext import commands
 from discord import app_commands, Interaction
 import asyncio
+import hashlib
 import json
-import os
 import random
+from typing import Dict, List
 
-from utils.grid import gerar_grid
+from utils.grid import gerar_grid, grid_filename, CARD_FIELDS, DEFAULT_GRID_FORMAT, DEFAULT_GRID_QUALITY
 from utils.dice import roll_damage
-from cogs.monster_admin import load_monsters
+from utils.storage import player_store
+from utils import catalogs
+from utils.autocomplete import monsters_index, ranks_index
+from utils.combat_state import Combat, MonsterInstance, monster_template
 
 # ============================================================
-# CONFIGURAÇÕES / PATHS
+# CONFIGURAÇÕES
 # ============================================================
-RANKS_PATH = "./data/ranks.json"
-RANKS_PLAYER_PATH = "./data/ranks_player.json"
-PLAYERS_PATH = "./data/players.json"
-
 # Imagem padrão para monstros sem img
 DEFAULT_IMAGE = "https://i.pinimg.com/736x/85/8d/96/858d96566ab8da9407ae5ccc1af0b5d1.jpg"
 
-# estrutura global de combates ativos
-active_combat = {}
-
-
-# ============================================================
-# Helpers JSON
-# ============================================================
-def load_json(path, default=None):
-    if default is None:
-        default = {}
-    if not os.path.exists(path):
-        with open(path, "w", encoding="utf8") as f:
-            json.dump(default, f, indent=4, ensure_ascii=False)
-    with open(path, "r", encoding="utf8") as f:
-        return json.load(f)
-
-
-def save_json(path, data):
-    with open(path, "w", encoding="utf8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
-
+# estrutura global de combates ativos (guild_id -> Combat)
+active_combat: Dict[int, Combat] = {}
 
-def load_players():
-    return load_json(PLAYERS_PATH, {})
-
-
-def save_players(data):
-    save_json(PLAYERS_PATH, data)
-
-
-def load_ranks():
-    return load_json(RANKS_PATH, {})
-
-
-def load_ranks_player():
-    return load_json(RANKS_PLAYER_PATH, {})
+# janela (s) em que várias mudanças seguidas viram uma única edição do status
+STATUS_DEBOUNCE = 1.0
 
 
 # ============================================================
@@ -74,18 +43,11 @@ def life_bar(current, max_hp, size=20):
 # AUTOCOMPLETE (async)
 # ============================================================
 async def autocomplete_inimigo(interaction: Interaction, current: str):
-    monsters = load_monsters()
-    choices = []
-    current = (current or "").lower()
-    for key in monsters.keys():
-        if current in key.lower():
-            choices.append(app_commands.Choice(name=monsters[key].get("nome", key).capitalize(), value=key))
-    return choices[:25]
+    return monsters_index.choices(current)
 
 
 async def autocomplete_rank(interaction: Interaction, current: str):
-    ranks = ["bronze", "prata", "ouro", "ouro negro", "lendário"]
-    return [app_commands.Choice(name=r.capitalize(), value=r) for r in ranks if current.lower() in r.lower()][:25]
+    return ranks_index.choices(current)
 
 
 async def autocomplete_nivel(interaction: Interaction, current: str):
@@ -96,133 +58,340 @@ async def autocomplete_nivel(interaction: Interaction, current: str):
 # ============================================================
 # Update status message (grid + embed listing monsters & players)
 # ============================================================
+# guilds com status desatualizado e a tarefa que vai redesenhá-lo
+_status_dirty = set()
+_status_tasks: Dict[int, asyncio.Task] = {}
+
+
 async def update_main_status(guild_id: int, bot: commands.Bot):
+    """
+    Marca o status da guild como desatualizado e retorna na hora.
+    Uma tarefa por guild espera STATUS_DEBOUNCE e faz um único render + edição,
+    não importa quantas mudanças chegaram nesse meio tempo.
+    """
+    _status_dirty.add(guild_id)
+    task = _status_tasks.get(guild_id)
+    if task is None or task.done():
+        _status_tasks[guild_id] = asyncio.ensure_future(_status_worker(guild_id, bot))
+
+
+async def _status_worker(guild_id: int, bot: commands.Bot):
+    try:
+        # mudanças que chegarem durante o render disparam mais uma rodada
+        while guild_id in _status_dirty:
+            await asyncio.sleep(STATUS_DEBOUNCE)
+            _status_dirty.discard(guild_id)
+            try:
+                await render_main_status(guild_id, bot)
+            except Exception as e:
+                print(f"❌ Erro ao atualizar status do combate ({guild_id}): {e}")
+    finally:
+        _status_tasks.pop(guild_id, None)
+
+
+# ============================================================
+# Paginação do status (limites do Discord: 1024 por campo, 25 campos por embed,
+# 6000 caracteres somando todos os embeds da mensagem)
+# ============================================================
+STATUS_PAGE_SIZE = 12  # monstros por página (lista + grid)
+FIELD_LIMIT = 1024
+MESSAGE_LIMIT = 5800  # margem abaixo dos 6000
+MAX_FIELDS = 25
+
+
+def _sorted_monster_ids(monsters: Dict[int, MonsterInstance]) -> list:
+    return sorted(monsters)
+
+
+def _page_count(monsters: Dict[int, MonsterInstance]) -> int:
+    return max(1, -(-len(monsters) // STATUS_PAGE_SIZE))
+
+
+def _chunk_blocks(blocks: List[str], limit: int = FIELD_LIMIT) -> List[tuple]:
+    # junta blocos de texto em pedaços (texto, nº de blocos) que cabem num campo
+    chunks, current, count = [], "", 0
+    for block in blocks:
+        block = block[:limit]
+        if len(current) + len(block) > limit:
+            chunks.append((current, count))
+            current, count = "", 0
+        current += block
+        count += 1
+    if current:
+        chunks.append((current, count))
+    return chunks
+
+
+def _add_fields(embeds: List[discord.Embed], name: str, blocks: List[str], empty: str):
+    # campos além de 25 vão para um embed de continuação; o que passar do limite
+    # da mensagem vira um aviso "… e mais N"
+    chunks = _chunk_blocks(blocks) or [(empty, 0)]
+    for i, (chunk, _) in enumerate(chunks):
+        field_name = name if i == 0 else f"{name} (cont.)"
+        used = sum(len(e) for e in embeds)
+        last = embeds[-1]
+        if used + len(field_name) + len(chunk) > MESSAGE_LIMIT - 100:
+            hidden = sum(n for _, n in chunks[i:])
+            if len(last.fields) >= MAX_FIELDS:
+                last = discord.Embed(color=last.color)
+                embeds.append(last)
+            last.add_field(name=field_name, value=f"… e mais {hidden}", inline=False)
+            return
+        # a última vaga de cada embed fica reservada para o aviso "… e mais N"
+        if len(last.fields) >= MAX_FIELDS - 1:
+            last = discord.Embed(color=last.color)
+            embeds.append(last)
+        last.add_field(name=field_name, value=chunk, inline=False)
+
+
+def _embeds_hash(embeds: List[discord.Embed]) -> str:
+    payload = json.dumps([e.to_dict() for e in embeds], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf8")).hexdigest()
+
+
+def _grid_signature(monsters: Dict[int, MonsterInstance], ids: list, formato: str, qualidade: int) -> tuple:
+    # tudo o que aparece na imagem: se não mudou, o anexo atual continua valendo
+    return (formato, qualidade) + tuple(tuple(getattr(monsters[k], f) for f in CARD_FIELDS) for k in ids)
+
+
+class StatusPageView(discord.ui.View):
+    """Botões ◀ ▶ da mensagem de status quando os monstros não cabem numa página."""
+
+    def __init__(self, guild_id: int):
+        super().__init__(timeout=None)
+        self.guild_id = guild_id
+
+    async def _turn(self, interaction: Interaction, delta: int):
+        data = active_combat.get(self.guild_id)
+        if not data:
+            return await interaction.response.send_message("Nenhum combate ativo.", ephemeral=True)
+        data.status_page = (data.status_page + delta) % _page_count(data.monsters)
+        await interaction.response.defer()
+        await update_main_status(self.guild_id, interaction.client)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def anterior(self, interaction: Interaction, button: discord.ui.Button):
+        await self._turn(interaction, -1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def proxima(self, interaction: Interaction, button: discord.ui.Button):
+        await self._turn(interaction, 1)
+
+
+async def render_main_status(guild_id: int, bot: commands.Bot):
     if guild_id not in active_combat:
         return
 
-    data = active_combat[guild_id]
-    channel = bot.get_channel(data.get("channel_id"))
+    data: Combat = active_combat[guild_id]
+    channel = bot.get_channel(data.channel_id)
     if channel is None:
         return
 
-    monsters = data.get("monsters", {})
-    players = data.get("players", {})
+    monsters = data.monsters
+    players = data.players
 
-    # gerar grid (pode falhar; catch)
-    try:
-        grid_buffer = await gerar_grid(monsters, colunas=3)
-    except Exception:
-        grid_buffer = None
+    ids = _sorted_monster_ids(monsters)
+    alive_count = data.alive_count()
+    pages = _page_count(monsters)
+    page = min(data.status_page, pages - 1)
+    data.status_page = page
+    page_ids = ids[page * STATUS_PAGE_SIZE:(page + 1) * STATUS_PAGE_SIZE]
 
-    embed = discord.Embed(title="📋 Status do Combate", color=discord.Color.blurple())
+    title = "📋 Status do Combate"
+    if pages > 1:
+        title += f" — página {page + 1}/{pages}"
+    embeds = [discord.Embed(title=title, color=discord.Color.blurple())]
 
-    # Monstros
-    alive_count = 0
-    monster_text = ""
-    # ordenar por id (se chaves forem ints)
-    keys = sorted([k for k in monsters.keys()], key=lambda x: int(x) if isinstance(x, (int, str)) and str(x).isdigit() else x)
-    for mid in keys:
+    # Monstros (só os da página atual)
+    monster_blocks = []
+    for mid in page_ids:
         m = monsters[mid]
-        estado = "💀 Morto" if m.get("vida_atual", 0) <= 0 else "⚔️ Vivo"
-        if m.get("vida_atual", 0) > 0:
-            alive_count += 1
-        monster_text += f"**{m.get('nome','?')} #{mid}**\n{life_bar(m.get('vida_atual',0), m.get('vida_max',1))}\nKI: {m.get('ki',0)} • CA: {m.get('ca',0)} • BBA: {m.get('bba',0)} • {estado}\n\n"
-
-    embed.add_field(name=f"🟥 Inimigos (Vivos: {alive_count})", value=monster_text or "Nenhum inimigo em campo.", inline=False)
+        estado = "💀 Morto" if m.vida_atual <= 0 else "⚔️ Vivo"
+        monster_blocks.append(f"**{m.nome} #{mid}**\n{life_bar(m.vida_atual, m.vida_max)}\nKI: {m.ki} • CA: {m.ca} • BBA: {m.bba} • {estado}\n\n")
+    _add_fields(embeds, f"🟥 Inimigos (Vivos: {alive_count}/{len(ids)})", monster_blocks, "Nenhum inimigo em campo.")
 
     # Players
-    players_text = ""
+    player_blocks = []
     for uid, p in players.items():
         member = channel.guild.get_member(int(uid)) if channel and channel.guild else None
         display = member.display_name if member else uid
         estado = "❌ Inconsciente" if p.get("vida_atual", 0) <= 0 else "⚔️ Ativo"
-        players_text += f"**{display}** — HP: {p.get('vida_atual',0)}/{p.get('vida_max',0)} • QI: {p.get('mana_atual',0)}/{p.get('mana_max',0)} • {estado}\n\n"
-
-    embed.add_field(name="🟦 Jogadores", value=players_text or "Nenhum jogador no combate.", inline=False)
-    embed.set_footer(text="Grid: monstros | Lista: players")
+        player_blocks.append(f"**{display}** — HP: {p.get('vida_atual',0)}/{p.get('vida_max',0)} • QI: {p.get('mana_atual',0)}/{p.get('mana_max',0)} • {estado}\n\n")
+    _add_fields(embeds, "🟦 Jogadores", player_blocks, "Nenhum jogador no combate.")
+    embeds[-1].set_footer(text="Grid: monstros | Lista: players")
+    embed = embeds[0]
+
+    # botões de página só quando há mais de uma
+    view = None
+    paged = pages > 1
+    if paged != data.status_paged:
+        view = StatusPageView(guild_id) if paged else discord.utils.MISSING
+    data.status_paged = paged
+
+    # gerar grid (só a página atual) só se algo visível nele mudou
+    settings = catalogs.guild_settings.get(str(guild_id)) or {}
+    formato = settings.get("grid_formato", DEFAULT_GRID_FORMAT)
+    qualidade = settings.get("grid_qualidade", DEFAULT_GRID_QUALITY)
+    page_monsters = {k: monsters[k] for k in page_ids}
+    grid_sig = _grid_signature(monsters, page_ids, formato, qualidade)
+    file = None
+    if grid_sig != data.status_grid_sig or not data.main_message_id:
+        file = await _grid_file(page_monsters, formato, qualidade)
+        data.status_grid_file = file.filename if file else None
+    if data.status_grid_file:
+        embed.set_image(url=f"attachment://{data.status_grid_file}")
+
+    # nada visível mudou: nenhuma chamada à API
+    if file is None and view is None and data.main_message_id \
+            and _embeds_hash(embeds) == data.status_embed_hash:
+        await _rename_channel(guild_id, bot, alive_count)
+        return
 
-    # enviar/editar mensagem
+    # enviar/editar mensagem (a mensagem parcial evita um fetch por atualização)
+    msg = data.status_msg
+    if data.main_message_id and (msg is None or msg.id != data.main_message_id):
+        msg = channel.get_partial_message(data.main_message_id)
+    extra = {} if view is None else {"view": None if view is discord.utils.MISSING else view}
     try:
-        if grid_buffer:
-            file = discord.File(grid_buffer, filename="grid.png")
-            embed.set_image(url="attachment://grid.png")
-            if data.get("main_message_id"):
-                try:
-                    msg = await channel.fetch_message(data["main_message_id"])
-                    await msg.edit(embed=embed, attachments=[file])
-                except Exception:
-                    sent = await channel.send(embed=embed, file=file)
-                    data["main_message_id"] = sent.id
-            else:
-                sent = await channel.send(embed=embed, file=file)
-                data["main_message_id"] = sent.id
-        else:
-            if data.get("main_message_id"):
-                try:
-                    msg = await channel.fetch_message(data["main_message_id"])
-                    await msg.edit(embed=embed)
-                except Exception:
-                    sent = await channel.send(embed=embed)
-                    data["main_message_id"] = sent.id
-            else:
-                sent = await channel.send(embed=embed)
-                data["main_message_id"] = sent.id
+        if msg is not None:
+            try:
+                if file is not None:
+                    await msg.edit(embeds=embeds, attachments=[file], **extra)
+                elif data.status_grid_file:
+                    # o anexo atual continua valendo
+                    await msg.edit(embeds=embeds, **extra)
+                else:
+                    await msg.edit(embeds=embeds, attachments=[], **extra)
+            except discord.HTTPException:
+                msg = None
+        if msg is None:
+            if file is None and data.status_grid_file:
+                # mensagem nova precisa do anexo de novo
+                file = await _grid_file(page_monsters, formato, qualidade)
+                if file is None:
+                    data.status_grid_file = None
+                    embed.set_image(url=None)
+            send = {"embeds": embeds}
+            if file:
+                send["file"] = file
+            if paged:
+                send["view"] = StatusPageView(guild_id)
+            msg = await channel.send(**send)
+            data.main_message_id = msg.id
+        data.status_msg = msg
+        data.status_embed_hash = _embeds_hash(embeds)
+        # sem grid (falhou): tenta de novo na próxima atualização
+        data.status_grid_sig = grid_sig if data.status_grid_file else None
     except Exception:
         # fallback simples: enviar embed sem imagem
         try:
-            sent = await channel.send(embed=embed)
-            data["main_message_id"] = sent.id
+            embed.set_image(url=None)
+            sent = await channel.send(embeds=embeds)
+            data.main_message_id = sent.id
+            data.status_msg = sent
+            data.status_grid_sig = None
+            data.status_grid_file = None
+            data.status_embed_hash = None
+            data.status_paged = False
         except Exception:
             pass
 
-    # update channel name
+    await _rename_channel(guild_id, bot, alive_count)
+
+
+async def _grid_file(monsters: Dict[int, MonsterInstance], formato: str, qualidade: int):
+    try:
+        buffer = await gerar_grid(monsters, colunas=3, formato=formato, qualidade=qualidade)
+    except Exception:
+        return None
+    return discord.File(buffer, filename=grid_filename(formato)) if buffer else None
+
+
+# ============================================================
+# Renomear o canal: o Discord aceita ~2 renomeações a cada 10 minutos
+# ============================================================
+RENAME_LIMIT = 2
+RENAME_WINDOW = 600.0
+
+
+async def _rename_channel(guild_id: int, bot: commands.Bot, alive_count: int):
+    data = active_combat.get(guild_id)
+    if not data:
+        return
+    channel = bot.get_channel(data.channel_id)
+    if channel is None:
+        return
+    # só renomeia quando o número de vivos muda
+    data.channel_alive = alive_count
+    if alive_count == data.channel_named_alive:
+        return
+
+    loop = asyncio.get_running_loop()
+    now = loop.time()
+    renames = [t for t in data.channel_renames if now - t < RENAME_WINDOW]
+    data.channel_renames = renames
+    if len(renames) >= RENAME_LIMIT:
+        # sem orçamento agora: tenta de novo quando a renomeação mais antiga expirar,
+        # já com o número de vivos mais recente
+        if data.channel_rename_timer is None:
+            delay = RENAME_WINDOW - (now - renames[0]) + 1
+            data.channel_rename_timer = loop.call_later(delay, _deferred_rename, guild_id, bot, data.channel_id)
+        return
+
+    renames.append(now)
+    data.channel_named_alive = alive_count
+    base = data.channel_base_name or channel.name
     try:
-        base = data.get("channel_base_name", channel.name)
-        new_name = f"{base} ({alive_count} vivos)"
-        if len(new_name) > 100:
-            new_name = new_name[:100]
-        await channel.edit(name=new_name)
+        await channel.edit(name=f"{base} ({alive_count} vivos)"[:100])
     except Exception:
         pass
 
 
+def _deferred_rename(guild_id: int, bot: commands.Bot, channel_id: int):
+    data = active_combat.get(guild_id)
+    if not data or data.channel_id != channel_id:
+        return
+    data.channel_rename_timer = None
+    asyncio.ensure_future(_rename_channel(guild_id, bot, data.channel_alive))
+
+
 # ============================================================
 # Aplicar dano em player (persistente)
 # ============================================================
 async def apply_damage_to_player(guild_id: int, target_id: int, amount: int, bot: commands.Bot, channel: discord.TextChannel):
-    players_db = load_players()
     key = str(target_id)
-    if key not in players_db:
+    if key not in player_store:
         # cria ficha padrão bronze nível 1 a partir de ranks_player.json
-        rp = load_ranks_player()
+        rp = catalogs.ranks_player()
         if "bronze" in rp and "1" in rp["bronze"]:
             entry = rp["bronze"]["1"]
-            players_db[key] = {
+            player_store.put(key, {
                 "rank": "bronze",
                 "nivel": 1,
                 "vida_max": entry.get("hp", 10),
                 "vida_atual": entry.get("hp", 10),
                 "mana_max": entry.get("qi", 0),
                 "mana_atual": entry.get("qi", 0)
-            }
+            })
         else:
-            players_db[key] = {
+            player_store.put(key, {
                 "rank": "bronze",
                 "nivel": 1,
                 "vida_max": 10,
                 "vida_atual": 10,
                 "mana_max": 1,
                 "mana_atual": 1
-            }
+            })
+        player_store.save(key)
 
-    players_db[key]["vida_atual"] = max(0, int(players_db[key].get("vida_atual", 0)) - int(amount))
-    save_players(players_db)
+    player_store.change_hp(key, -int(amount))
+    player = player_store.get(key)
 
     # atualizar snapshot no combate
-    if guild_id in active_combat and key in active_combat[guild_id].get("players", {}):
-        active_combat[guild_id]["players"][key] = players_db[key]
+    if guild_id in active_combat and key in active_combat[guild_id].players:
+        active_combat[guild_id].players[key] = player
 
-    await channel.send(f"⚔️ <@{target_id}> sofreu **{amount}** de dano! Vida atual: {players_db[key]['vida_atual']}/{players_db[key]['vida_max']}")
+    await channel.send(f"⚔️ <@{target_id}> sofreu **{amount}** de dano! Vida atual: {player['vida_atual']}/{player['vida_max']}")
     await update_main_status(guild_id, bot)
 
 
@@ -230,7 +399,7 @@ async def apply_damage_to_player(guild_id: int, target_id: int, amount: int, bot
 # View de confirmação de ataque (botões)
 # ============================================================
 class MonsterAttackView(discord.ui.View):
-    def __init__(self, guild_id: int, monster_id: int, monster: dict, target: discord.Member, bot: commands.Bot):
+    def __init__(self, guild_id: int, monster_id: int, monster: MonsterInstance, target: discord.Member, bot: commands.Bot):
         super().__init__(timeout=120)
         self.guild_id = guild_id
         self.monster_id = monster_id
@@ -249,16 +418,17 @@ class MonsterAttackView(discord.ui.View):
     async def hit_button(self, interaction: Interaction, button: discord.ui.Button):
         self.resolved = True
         # rolar dano e aplicar
-        dano = roll_damage(self.monster.get("dano", "1d4"))
-        channel = self.bot.get_channel(active_combat[self.guild_id]["channel_id"])
+        dano = roll_damage(self.monster.dano)
+        channel = self.bot.get_channel(active_combat[self.guild_id].channel_id)
         await apply_damage_to_player(self.guild_id, self.target.id, dano, self.bot, channel)
 
         # enviar resultado público
+        alvo = player_store.get(self.target.id) or {}
         await interaction.response.send_message(
-            f"🎯 **{self.monster.get('nome')} #{self.monster_id}** acertou {self.target.mention}!\n"
+            f"🎯 **{self.monster.nome} #{self.monster_id}** acertou {self.target.mention}!\n"
             f"💥 Dano causado: **{dano}**\n"
-            f"❤️ Vida atual: **{load_players().get(str(self.target.id), {}).get('vida_atual', 0)}**/"
-            f"**{load_players().get(str(self.target.id), {}).get('vida_max', 0)}**",
+            f"❤️ Vida atual: **{alvo.get('vida_atual', 0)}**/"
+            f"**{alvo.get('vida_max', 0)}**",
             allowed_mentions=discord.AllowedMentions(users=True)
         )
 
@@ -273,9 +443,9 @@ class MonsterAttackView(discord.ui.View):
     @discord.ui.button(label="❌ Errou", style=discord.ButtonStyle.danger)
     async def miss_button(self, interaction: Interaction, button: discord.ui.Button):
         self.resolved = True
-        channel = self.bot.get_channel(active_combat[self.guild_id]["channel_id"])
+        channel = self.bot.get_channel(active_combat[self.guild_id].channel_id)
         await interaction.response.send_message(
-            f"❌ **{self.monster.get('nome')} #{self.monster_id} errou o ataque!**\n"
+            f"❌ **{self.monster.nome} #{self.monster_id} errou o ataque!**\n"
             f"🔁 {self.target.mention} tem chance de ataque de oportunidade!",
             allowed_mentions=discord.AllowedMentions(users=True)
         )
@@ -302,8 +472,8 @@ class Combate(commands.Cog):
     @app_commands.autocomplete(rank=autocomplete_rank)
     @app_commands.autocomplete(nivel=autocomplete_nivel)
     async def combate_iniciar(self, interaction: Interaction, inimigo: str, rank: str, nivel: str, quantidade: int):
-        monsters_db = load_monsters()
-        ranks = load_ranks()
+        monsters_db = catalogs.monsters()
+        ranks = catalogs.ranks()
 
         inimigo_key = inimigo
         rank_key = rank
@@ -328,30 +498,14 @@ class Combate(commands.Cog):
         channel = await guild.create_text_channel(name=f"{base_channel_name} ({quantidade} vivos)", category=category)
 
         # inicializa combate
-        active_combat[guild.id] = {
-            "channel_id": channel.id,
-            "main_message_id": None,
-            "channel_base_name": base_channel_name,
-            "monsters": {},
-            "players": {}
-        }
-
-        # cria inimigos
-        for i in range(1, quantidade + 1):
-            mon_src = monsters_db[inimigo_key]
-            active_combat[guild.id]["monsters"][i] = {
-                "id": i,
-                "nome": mon_src.get("nome", inimigo_key).capitalize(),
-                "rank": rank_key.capitalize(),
-                "nivel": int(nivel),
-                "vida_max": stats["vida"],
-                "vida_atual": stats["vida"],
-                "ca": stats["ca"],
-                "ki": stats["ki"],
-                "dano": stats["dano"],
-                "img": mon_src.get("img") or DEFAULT_IMAGE,
-                "bba": stats.get("bba", 0)
-            }
+        combate = active_combat[guild.id] = Combat(channel.id, base_channel_name)
+        combate.channel_named_alive = quantidade  # o canal já nasce com este nome
+
+        # cria inimigos (todos compartilham o mesmo template de stats)
+        mon_src = monsters_db[inimigo_key]
+        tpl = monster_template(mon_src.get("nome", inimigo_key).capitalize(), rank_key.capitalize(), nivel,
+                               stats, mon_src.get("img") or DEFAULT_IMAGE)
+        combate.spawn(tpl, quantidade)
 
         # mensagens de entrada por reação
         start_msg = await channel.send("⚔️ **Iniciando combate!** Reaja com ✅ para entrar no combate. Você tem 20 segundos.")
@@ -370,12 +524,12 @@ class Combate(commands.Cog):
                         users_in.append(user.id)
 
         # criar snapshot de players
-        players_db = load_players()
+        players_db = player_store.all()
         for uid in users_in:
             key = str(uid)
             if key not in players_db:
                 # cria ficha padrão bronze 1
-                rp = load_ranks_player()
+                rp = catalogs.ranks_player()
                 bronze1 = rp.get("bronze", {}).get("1", {})
                 hp = bronze1.get("hp", 10)
                 qi = bronze1.get("qi", 0)
@@ -387,10 +541,9 @@ class Combate(commands.Cog):
                     "mana_max": qi,
                     "mana_atual": qi
                 }
+                player_store.save(key)
             # snapshot do combate
-            active_combat[guild.id]["players"][key] = players_db[key]
-
-        save_players(players_db)
+            combate.players[key] = players_db[key]
 
         # envia status inicial
         await update_main_status(guild.id, self.bot)
@@ -404,7 +557,7 @@ class Combate(commands.Cog):
         if gid not in active_combat:
             return await interaction.response.send_message("❌ Nenhum combate ativo.", ephemeral=True)
 
-        monsters = active_combat[gid]["monsters"]
+        monsters = active_combat[gid].monsters
         if inimigo_id not in monsters:
             return await interaction.response.send_message("❌ Monstro não encontrado.", ephemeral=True)
 
@@ -412,11 +565,11 @@ class Combate(commands.Cog):
 
         # rola 1d20 + BBA
         d20 = random.randint(1, 20)
-        bba = int(monster.get("bba", 0))
+        bba = monster.bba
         total = d20 + bba
 
         embed = discord.Embed(
-            title=f"🗡️ Ataque: {monster.get('nome')} #{inimigo_id}",
+            title=f"🗡️ Ataque: {monster.nome} #{inimigo_id}",
             description=(
                 f"🎯 Alvo: {alvo.mention}\n"
                 f"🎲 Rolagem: `1d20` → **{d20}** + BBA **{bba}** = **{total}**\n\n"
@@ -424,11 +577,11 @@ class Combate(commands.Cog):
             ),
             color=discord.Color.orange()
         )
-        embed.set_thumbnail(url=monster.get("img") or DEFAULT_IMAGE)
+        embed.set_thumbnail(url=monster.img or DEFAULT_IMAGE)
 
         view = MonsterAttackView(gid, inimigo_id, monster, alvo, self.bot)
 
-        channel = self.bot.get_channel(active_combat[gid]["channel_id"]) or interaction.channel
+        channel = self.bot.get_channel(active_combat[gid].channel_id) or interaction.channel
         await channel.send(embed=embed, view=view)
 
         await interaction.response.send_message(f"✅ Ataque iniciado para {alvo.mention}.", ephemeral=False)
@@ -438,11 +591,11 @@ class Combate(commands.Cog):
     # -----------------------
     @app_commands.command(name="player_recuperar", description="Recupera vida de um jogador (público).")
     async def player_recuperar(self, interaction: Interaction, jogador: discord.Member, valor: int):
-        db = load_players()
+        db = player_store.all()
         key = str(jogador.id)
         if key not in db:
             # cria default
-            rp = load_ranks_player()
+            rp = catalogs.ranks_player()
             bronze1 = rp.get("bronze", {}).get("1", {})
             hp = bronze1.get("hp", 10)
             qi = bronze1.get("qi", 0)
@@ -454,16 +607,16 @@ class Combate(commands.Cog):
                 "mana_max": qi,
                 "mana_atual": qi
             }
+            player_store.save(key)
 
         before = db[key]["vida_atual"]
-        db[key]["vida_atual"] = min(db[key]["vida_max"], db[key]["vida_atual"] + int(valor))
-        save_players(db)
+        player_store.change_hp(key, int(valor))
 
         # atualizar snapshot em combates ativos
         for gid, data in active_combat.items():
-            if key in data.get("players", {}):
-                data["players"][key] = db[key]
-                channel = self.bot.get_channel(data["channel_id"])
+            if key in data.players:
+                data.players[key] = db[key]
+                channel = self.bot.get_channel(data.channel_id)
                 if before <= 0 and db[key]["vida_atual"] >= (db[key]["vida_max"] * 0.5):
                     await channel.send(f"✨ {jogador.mention} recuperou e voltou ao combate!")
                 await update_main_status(gid, self.bot)
@@ -492,7 +645,7 @@ class Combate(commands.Cog):
             return await interaction.response.send_message("❌ Nenhum combate ativo.", ephemeral=False)
 
         data = active_combat[gid]
-        channel = self.bot.get_channel(data.get("channel_id"))
+        channel = self.bot.get_channel(data.channel_id)
         del active_combat[gid]
         if deletar_canal and channel:
             try:
@@ -3,19 +3,18 @@ import discord
 from discord.ext import commands
 from discord import app_commands, Interaction
 import asyncio
-import json
-import os
 import random
 import math
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
-# Paths
-PLAYERS_PATH = "./data/players.json"
-MONSTERS_PATH = "./data/monsters.json"
-EQUIP_PATH = "./data/equipamentos.json"
-MAGIAS_PATH = "./data/magias.json"
-ITEMS_PATH = "./data/items.json"
-RANKS_PLAYER_PATH = "./data/ranks_player.json"
+from utils.storage import player_store
+from utils.dice import roll_dice, roll_batch
+from utils import catalogs
+from utils import simulator
+from utils.stats import player_stats, stats_cache
+from utils.combat_state import Combat, MonsterInstance, TurnEntry, monster_template
+from utils.grid import DEFAULT_GRID_QUALITY
+from utils.autocomplete import autocomplete_monstros, autocomplete_ranks, autocomplete_equipamentos, autocomplete_magias
 
 # Import active_combat from combate.py (versão B)
 try:
@@ -25,114 +24,83 @@ except Exception:
     def update_main_status(*args, **kwargs):
         return
 
-# ======================================================
-# JSON helpers
-# ======================================================
-def load_json(path: str, default=None):
-    if default is None:
-        default = {}
-    if not os.path.exists(path):
-        with open(path, "w", encoding="utf8") as f:
-            json.dump(default, f, indent=4, ensure_ascii=False)
-    with open(path, "r", encoding="utf8") as f:
-        return json.load(f)
-
-def save_json(path: str, data):
-    with open(path, "w", encoding="utf8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
-
-def load_players():
-    return load_json(PLAYERS_PATH, {})
-
-def save_players(data):
-    save_json(PLAYERS_PATH, data)
-
-def load_monsters():
-    return load_json(MONSTERS_PATH, {})
-
-def load_equip():
-    return load_json(EQUIP_PATH, {})
-
-def load_magias():
-    return load_json(MAGIAS_PATH, {})
-
-def load_items():
-    return load_json(ITEMS_PATH, {})
-
-def load_ranks_player():
-    return load_json(RANKS_PLAYER_PATH, {})
-
-# ======================================================
-# Dice utils
-# ======================================================
-import re
-def roll_dice(formula: str) -> int:
-    s = (formula or "").replace(" ", "")
-    m = re.match(r"(\d+)d(\d+)([+\-]\d+)?", s)
-    if not m:
-        try:
-            return int(s)
-        except:
-            return 0
-    n = int(m.group(1)); faces = int(m.group(2)); mod = int(m.group(3) or 0)
-    total = 0
-    for _ in range(n):
-        total += random.randint(1, faces)
-    return total + mod
+# limite de opções de um select do Discord; valor da opção "alvo aleatório"
+SELECT_LIMIT = 25
+RANDOM_TARGET = "aleatorio"
+# XP de uma magia (xp_gain por conjuração) para dominar cada rank acima do 1
+MAGIC_XP_PER_RANK = 100
 
 # ======================================================
 # Initiative and turn helpers
 # ======================================================
 def calc_initiative_for_player(player: Dict[str, Any]) -> int:
-    dex = int(player.get("atributos", {}).get("destreza", 0))
+    dex = player_stats(player).attr("destreza")
     return random.randint(1, 20) + dex
 
-def calc_initiative_for_monster(mon: Dict[str, Any]) -> int:
+def calc_initiative_for_monster(mon: MonsterInstance) -> int:
     # monsters may have 'init_bonus'
     return random.randint(1, 20) + int(mon.get("init_bonus", 0))
 
-def build_turn_order(snapshot_players: Dict[str, Any], monsters: Dict[str, Any]) -> List[Dict[str, Any]]:
+def build_turn_order(snapshot_players: Dict[str, Any], monsters: Dict[int, MonsterInstance]) -> List[TurnEntry]:
     order = []
     for uid, p in snapshot_players.items():
         init = calc_initiative_for_player(p)
-        order.append({"type": "player", "id": str(uid), "initiative": init})
+        order.append(TurnEntry("player", str(uid), init))
     for mid, m in monsters.items():
         init = calc_initiative_for_monster(m)
-        order.append({"type": "monster", "id": int(mid), "initiative": init})
+        order.append(TurnEntry("monster", int(mid), init))
     # sort desc
-    order.sort(key=lambda x: x["initiative"], reverse=True)
+    order.sort(key=lambda x: x.initiative, reverse=True)
     return order
 
 # ======================================================
 # Small helpers to compute CA and apply damage
 # ======================================================
 def compute_ca_for_player(player: Dict[str, Any]) -> int:
-    base = int(player.get("ca_base", 10))
-    ca_bonus = int(player.get("ca_bonus", 0))
-    # equipment bonuses
-    equip = player.get("equip", {})
-    equip_db = load_equip()
-    for slot, key in (equip or {}).items():
-        if key:
-            info = equip_db.get(key, {})
-            base += int(info.get("ca_bonus", 0))
-    # buffs
-    for b in player.get("buffs", []):
-        base += int(b.get("ca_mod", 0))
-    return base + ca_bonus
+    # ca_base + equipamentos + buffs, em cache até equipar/desequipar/buff/nível mudar
+    return player_stats(player).ca
 
 def apply_damage_to_monster(guild_id: int, monster_id: int, dano: int):
     # modifies active_combat in-memory; caller should call update_main_status
     if guild_id not in active_combat:
         return
-    monsters = active_combat[guild_id].get("monsters", {})
-    if monster_id not in monsters:
-        return
-    m = monsters[monster_id]
-    before = int(m.get("vida_atual", 0))
-    m["vida_atual"] = max(0, before - int(dano))
-    monsters[monster_id] = m
-    active_combat[guild_id]["monsters"] = monsters
+    active_combat[guild_id].monsters.damage(monster_id, dano)
+
+def apply_area_damage(guild_id: int, dano_formula: str) -> Dict[int, int]:
+    # magias em área (rank 3+ em magias.json): uma rolagem em lote para todos os vivos
+    if guild_id not in active_combat:
+        return {}
+    monsters = active_combat[guild_id].monsters
+    alvos = monsters.alive_ids()
+    if not alvos:
+        return {}
+    danos = roll_batch(dano_formula, len(alvos))
+    # numa horda, uma única operação vetorizada sobre a coluna de vida
+    monsters.damage_many(alvos, danos)
+    return dict(zip(alvos, (int(d) for d in danos)))
+
+# ======================================================
+# Magias: domínio de rank
+# ======================================================
+def magic_rank_max(player: Dict[str, Any], magia: str) -> int:
+    # rank 1 ao aprender; +1 a cada MAGIC_XP_PER_RANK de XP na magia
+    try:
+        xp = int((player.get("magic_xp") or {}).get(magia) or 0)
+    except (TypeError, ValueError):
+        xp = 0
+    return 1 + xp // MAGIC_XP_PER_RANK
+
+def check_spell_rank(player: Dict[str, Any], magia: str, rank: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """(config do rank em magias.json, None) se o jogador pode conjurar; senão (None, motivo)."""
+    if magia not in (player.get("magic_xp") or {}):
+        return None, "Você não conhece essa magia."
+    cfg = ((catalogs.magias().get(magia) or {}).get("rank") or {}).get(str(rank))
+    if not cfg:
+        return None, "Rank inexistente para essa magia."
+    dominio = magic_rank_max(player, magia)
+    if not str(rank).isdigit() or int(rank) > dominio:
+        return None, f"Você só domina essa magia até o rank {dominio}."
+    return cfg, None
 
 # ======================================================
 # View: entry and start buttons (no sleep)
@@ -166,14 +134,14 @@ class IniciarCombateView(discord.ui.View):
 
         combate = active_combat[self.guild_id]
         # snapshot de players selecionados
-        players_db = load_players()
         for pid in list(self.jogadores):
             k = str(pid)
-            if k in players_db:
-                combate["players"][k] = players_db[k]
+            player = player_store.get(k)
+            if player is not None:
+                combate.players[k] = player
             else:
                 # cria ficha padrão
-                combate["players"][k] = {
+                combate.players[k] = {
                     "rank": "bronze", "nivel": 1,
                     "vida_max": 10, "vida_atual": 10,
                     "mana_max": 1, "mana_atual": 1,
@@ -184,14 +152,10 @@ class IniciarCombateView(discord.ui.View):
                 }
 
         # build turn order
-        ordem = build_turn_order(combate.get("players", {}), combate.get("monsters", {}))
-        combate["turn_order"] = ordem
-        combate["current_index"] = 0
-        combate["round"] = 1
-        combate["status"] = "running"
-
-        # save back
-        active_combat[self.guild_id] = combate
+        combate.turn_order = build_turn_order(combate.players, combate.monsters)
+        combate.current_index = 0
+        combate.round = 1
+        combate.status = "running"
 
         # send status update and initial turn embed
         await update_main_status(self.guild_id, interaction.client)
@@ -206,13 +170,14 @@ class CombateTurnos(commands.Cog):
 
     @app_commands.command(name="combate_iniciar", description="Inicia um combate (nova versão com botões).")
     @app_commands.describe(inimigo="chave do monstro no monsters.json", rank="rank", nivel="nivel do rank", quantidade="quantidade de inimigos")
+    @app_commands.autocomplete(inimigo=autocomplete_monstros, rank=autocomplete_ranks)
     async def combate_iniciar(self, interaction: Interaction, inimigo: str, rank: str, nivel: str, quantidade: int = 1):
         guild = interaction.guild
         if guild is None:
             return await interaction.response.send_message("Use em servidor.", ephemeral=True)
 
-        monsters_db = load_monsters()
-        ranks = load_ranks_player()
+        monsters_db = catalogs.monsters()
+        ranks = catalogs.ranks_player()
 
         if inimigo not in monsters_db:
             return await interaction.response.send_message("Monstro não encontrado no banco.", ephemeral=True)
@@ -227,36 +192,16 @@ class CombateTurnos(commands.Cog):
             category = await guild.create_category("COMBATES")
 
         base = f"combate-{inimigo}-{quantidade}"
-        channel = await guild.create_text_channel(f"{base} (0 vivos)", category=category)
+        channel = await guild.create_text_channel(f"{base} ({quantidade} vivos)", category=category)
 
         # inicializa active_combat
-        active_combat[guild.id] = {
-            "channel_id": channel.id,
-            "main_message_id": None,
-            "channel_base_name": base,
-            "monsters": {},
-            "players": {},
-            "turn_order": [],
-            "current_index": 0,
-            "round": 0,
-            "status": "waiting"
-        }
-
-        # cria monstros snapshot
-        for i in range(1, quantidade+1):
-            active_combat[guild.id]["monsters"][i] = {
-                "id": i,
-                "nome": monsters_db[inimigo].get("nome", inimigo),
-                "rank": rank,
-                "nivel": int(nivel),
-                "vida_max": stats["vida"],
-                "vida_atual": stats["vida"],
-                "ca": stats["ca"],
-                "ki": stats["ki"],
-                "dano": stats["dano"],
-                "img": monsters_db[inimigo].get("img"),
-                "bba": stats.get("bba", 0)
-            }
+        combate = active_combat[guild.id] = Combat(channel.id, base, status="waiting")
+        combate.channel_named_alive = quantidade  # o canal já nasce com este nome
+
+        # cria monstros (todos compartilham o mesmo template de stats)
+        tpl = monster_template(monsters_db[inimigo].get("nome", inimigo), rank, nivel, stats,
+                               monsters_db[inimigo].get("img"))
+        combate.spawn(tpl, quantidade)
 
         # envia mensagem inicial com botões de entrar/iniciar
         view = IniciarCombateView(guild.id, interaction.user.id)
@@ -265,48 +210,141 @@ class CombateTurnos(commands.Cog):
             view=view
         )
 
-        active_combat[guild.id]["main_message_id"] = sent.id
+        combate.main_message_id = sent.id
 
         await interaction.response.send_message(f"Canal criado: {channel.mention}", ephemeral=False)
 
+    @app_commands.command(name="combate_formato_grid", description="Define o formato da imagem do grid de combate neste servidor.")
+    @app_commands.describe(formato="formato da imagem", qualidade="qualidade (1-100) para WebP/JPEG")
+    @app_commands.choices(formato=[
+        app_commands.Choice(name="PNG com paleta (padrão, menor)", value="png8"),
+        app_commands.Choice(name="PNG completo", value="png"),
+        app_commands.Choice(name="WebP", value="webp"),
+        app_commands.Choice(name="JPEG", value="jpeg"),
+    ])
+    async def combate_formato_grid(self, interaction: Interaction, formato: app_commands.Choice[str], qualidade: int = DEFAULT_GRID_QUALITY):
+        if interaction.guild is None:
+            return await interaction.response.send_message("Use em servidor.", ephemeral=True)
+        if not interaction.user.guild_permissions.manage_guild:
+            return await interaction.response.send_message("Apenas o Mestre pode alterar o formato.", ephemeral=True)
+        settings = catalogs.guild_settings.load_mutable()
+        cfg = settings.setdefault(str(interaction.guild.id), {})
+        cfg["grid_formato"] = formato.value
+        cfg["grid_qualidade"] = max(1, min(100, int(qualidade)))
+        catalogs.guild_settings.replace(settings)
+        await interaction.response.send_message(f"🖼️ Grid de combate agora em **{formato.name}** (qualidade {cfg['grid_qualidade']}).", ephemeral=True)
+
+    @app_commands.command(name="combate_simular", description="Simula milhares de combates para balancear um encontro.")
+    @app_commands.describe(
+        rank="rank do monstro (ranks.json)", nivel="nível do monstro", quantidade="quantidade de monstros",
+        jogadores="quantidade de jogadores", player_rank="rank dos jogadores", player_nivel="nível dos jogadores",
+        arma="chave da arma em equipamentos.json", ataque="BBA + max(força, destreza) dos jogadores",
+        ca="CA dos jogadores", absorv="absorção dos jogadores", encontros="quantos combates simular"
+    )
+    @app_commands.autocomplete(rank=autocomplete_ranks, player_rank=autocomplete_ranks, arma=autocomplete_equipamentos)
+    async def combate_simular(self, interaction: Interaction, rank: str, nivel: str, quantidade: int = 1,
+                              jogadores: int = 1, player_rank: str = "bronze", player_nivel: str = "1",
+                              arma: Optional[str] = None, ataque: int = 0, ca: int = 10, absorv: int = 0,
+                              encontros: int = simulator.DEFAULT_ENCOUNTERS):
+        try:
+            enc = simulator.build_encounter(rank, nivel, quantidade, jogadores, player_rank, player_nivel,
+                                            arma, ataque, 0, ca, absorv)
+            simulator.check_limits(quantidade, jogadores, encontros)
+        except ValueError as e:
+            return await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+
+        await interaction.response.defer(thinking=True)
+        try:
+            res = await asyncio.to_thread(simulator.simulate, enc, encontros)
+        except RuntimeError as e:
+            return await interaction.followup.send(f"❌ {e}")
+
+        embed = discord.Embed(title="🧪 Simulação de encontro", description=f"```{simulator.format_report(enc, res)}```", color=discord.Color.dark_teal())
+        await interaction.followup.send(embed=embed)
+
+    @app_commands.command(name="magia_area", description="Conjura uma magia em área contra todos os inimigos vivos.")
+    @app_commands.describe(magia="magia que você conhece", rank="rank da magia (só ranks com área)")
+    @app_commands.autocomplete(magia=autocomplete_magias)
+    async def magia_area(self, interaction: Interaction, magia: str, rank: str):
+        gid = interaction.guild.id if interaction.guild else None
+        if gid not in active_combat:
+            return await interaction.response.send_message("Nenhum combate ativo.", ephemeral=True)
+        combate = active_combat[gid]
+        key = str(interaction.user.id)
+        if combate.status != "running":
+            return await interaction.response.send_message("O combate não está em andamento.", ephemeral=True)
+        actor = get_current_actor(gid)
+        if actor is None or actor.type != "player" or actor.id != key:
+            return await interaction.response.send_message("Não é a sua vez.", ephemeral=True)
+        player = player_store.get(key)
+        if not player:
+            return await interaction.response.send_message("Você não possui ficha.", ephemeral=True)
+        cfg, erro = check_spell_rank(player, magia, rank)
+        if erro:
+            return await interaction.response.send_message(erro, ephemeral=True)
+        if not cfg.get("area"):
+            return await interaction.response.send_message("Esse rank da magia não é em área.", ephemeral=True)
+        custo = int(cfg.get("custo_qi", 0))
+        if int(player.get("mana_atual", 0)) < custo:
+            return await interaction.response.send_message(f"QI insuficiente (precisa de {custo}).", ephemeral=True)
+        monsters = combate.monsters
+        vivos_antes = monsters.alive_count()
+        if not vivos_antes:
+            return await interaction.response.send_message("Nenhum inimigo vivo.", ephemeral=True)
+
+        # só os campos alterados (QI e XP da magia), não a ficha inteira
+        player_store.change_mana(key, -custo)
+        md = catalogs.magias()[magia]
+        magic_xp = dict(player.get("magic_xp") or {})
+        magic_xp[magia] = int(magic_xp.get(magia) or 0) + int(md.get("xp_gain", 0))
+        player_store.set_field(key, "magic_xp", magic_xp)
+
+        danos = apply_area_damage(gid, cfg.get("dano", "1d4"))
+        caidos = vivos_antes - monsters.alive_count()
+        # resumo (numa horda seriam centenas de linhas por alvo)
+        await interaction.response.send_message(
+            f"🔥 {interaction.user.mention} conjurou **{md.get('nome', magia)}** (rank {rank}, -{custo} QI): "
+            f"atingiu **{len(danos)}** inimigo(s), dano total **{sum(danos.values())}**, **{caidos}** caíram."
+        )
+        await update_main_status(gid, self.bot)
+
 # ======================================================
 # Advance turn and control view
 # ======================================================
-def get_current_actor(gid: int) -> Optional[Dict[str, Any]]:
+def get_current_actor(gid: int) -> Optional[TurnEntry]:
     data = active_combat.get(gid)
     if not data:
         return None
-    order = data.get("turn_order", [])
-    idx = data.get("current_index", 0)
+    order = data.turn_order
+    idx = data.current_index
     if not order:
         return None
     # wrap
     if idx < 0 or idx >= len(order):
         idx = 0
-        data["current_index"] = 0
+        data.current_index = 0
     return order[idx]
 
 async def advance_turn(guild_id: int, bot: commands.Bot):
     if guild_id not in active_combat:
         return
     data = active_combat[guild_id]
-    order = data.get("turn_order", [])
+    order = data.turn_order
     if not order:
         return
-    data["current_index"] = (data.get("current_index",0) + 1) % len(order)
-    if data["current_index"] == 0:
-        data["round"] = data.get("round",1) + 1
-    active_combat[guild_id] = data
+    data.current_index = (data.current_index + 1) % len(order)
+    if data.current_index == 0:
+        data.round += 1
     # update main status and announce current actor
     await update_main_status(guild_id, bot)
     actor = get_current_actor(guild_id)
-    channel = bot.get_channel(data["channel_id"])
+    channel = bot.get_channel(data.channel_id)
     if actor:
-        if actor["type"] == "player":
-            uid = int(actor["id"])
-            await channel.send(f"➡️ **Vez de <@{uid}>** — round {data.get('round',1)}")
+        if actor.type == "player":
+            uid = int(actor.id)
+            await channel.send(f"➡️ **Vez de <@{uid}>** — round {data.round}")
         else:
-            await channel.send(f"➡️ **Vez do Monstro #{actor['id']}** — round {data.get('round',1)}")
+            await channel.send(f"➡️ **Vez do Monstro #{actor.id}** — round {data.round}")
 
 class TurnControlView(discord.ui.View):
     def __init__(self, guild_id: int):
@@ -324,7 +362,7 @@ class TurnControlView(discord.ui.View):
     async def pause(self, interaction: Interaction, button: discord.ui.Button):
         gid = self.guild_id
         if gid in active_combat:
-            active_combat[gid]["status"] = "paused"
+            active_combat[gid].status = "paused"
             await interaction.response.send_message("⏸️ Combate pausado.", ephemeral=False)
             await update_main_status(gid, interaction.client)
         else:
@@ -353,10 +391,15 @@ class ActionMenuView(discord.ui.View):
         gid = self.guild_id
         if gid not in active_combat:
             return await interaction.response.send_message("Nenhum combate ativo.", ephemeral=True)
-        monsters = active_combat[gid].get("monsters", {})
+        monsters = active_combat[gid].monsters
+        alive = monsters.alive_ids()
         options = []
-        for mid, m in monsters.items():
-            label = f"{m.get('nome')} #{mid} ({m.get('vida_atual')}/{m.get('vida_max')})"
+        # o select aceita no máximo 25 opções: em hordas, a primeira sorteia um vivo
+        if len(alive) > SELECT_LIMIT:
+            options.append(discord.SelectOption(label=f"🎲 Alvo aleatório ({len(alive)} vivos)", value=RANDOM_TARGET))
+        for mid in alive[:SELECT_LIMIT - len(options)]:
+            m = monsters[mid]
+            label = f"{m.nome} #{mid} ({m.vida_atual}/{m.vida_max})"
             options.append(discord.SelectOption(label=label, value=str(mid)))
         if not options:
             return await interaction.response.send_message("Nenhum inimigo disponível.", ephemeral=True)
@@ -372,18 +415,23 @@ class ActionMenuView(discord.ui.View):
 
             @discord.ui.select()
             async def callback(self, select: discord.ui.Select, interaction_sel: Interaction):
-                target_id = int(select.values[0])
+                if select.values[0] == RANDOM_TARGET:
+                    target_id = active_combat[self.guild_id].monsters.random_alive()
+                    if target_id is None:
+                        return await interaction_sel.response.send_message("Nenhum inimigo vivo.", ephemeral=True)
+                else:
+                    target_id = int(select.values[0])
                 await interaction_sel.response.send_message(f"Você escolheu atacar o inimigo #{target_id}. Processando ataque...", ephemeral=False)
                 # rolar ataque: 1d20 + bba + forca/destreza do player
                 gid = self.guild_id
                 player_key = str(interaction_sel.user.id)
-                players_db = load_players()
-                player = players_db.get(player_key)
+                player = player_store.get(player_key)
                 if not player:
                     return await interaction_sel.followup.send("Sua ficha não foi encontrada.", ephemeral=True)
                 bba = int(player.get("bba", 0))
-                força = int(player.get("atributos", {}).get("forca", 0))
-                destreza = int(player.get("atributos", {}).get("destreza", 0))
+                stats = player_stats(player)
+                força = stats.attr("forca")
+                destreza = stats.attr("destreza")
                 # choose whether weapon is finesse etc. For simplicity, use forca + destreza average
                 mod_attr = max(força, destreza)
                 d20 = random.randint(1,20)
@@ -391,10 +439,10 @@ class ActionMenuView(discord.ui.View):
                 # prepare embed with roll
                 embed = discord.Embed(title=f"Ataque de {interaction_sel.user.display_name}", description=f"Rolagem: 1d20 → **{d20}** + BBA **{bba}** + Atributo **{mod_attr}** = **{total}**", color=discord.Color.orange())
                 # find monster
-                monster = active_combat[gid]["monsters"].get(target_id)
-                embed.add_field(name='Alvo', value=f"{monster.get('nome')} #{target_id}")
+                monster = active_combat[gid].monsters.get(target_id)
+                embed.add_field(name='Alvo', value=f"{monster.nome} #{target_id}")
                 view = MonsterHitConfirmView(gid, target_id, interaction_sel.user.id, total, interaction_sel.user)
-                ch = interaction_sel.client.get_channel(active_combat[gid]["channel_id"])
+                ch = interaction_sel.client.get_channel(active_combat[gid].channel_id)
                 try:
                     await ch.send(embed=embed, view=view)
                 except:
@@ -409,11 +457,10 @@ class ActionMenuView(discord.ui.View):
         # abrir menu de magias do jogador
         gid = self.guild_id
         player_key = str(interaction.user.id)
-        players_db = load_players()
-        player = players_db.get(player_key)
+        player = player_store.get(player_key)
         if not player:
             return await interaction.response.send_message("Você não possui ficha.", ephemeral=True)
-        magias_db = load_magias()
+        magias_db = catalogs.magias()
         # build options based on learned magias in player (magic_xp keys)
         learned = player.get("magic_xp", {})  # keys are magic ids
         opts = []
@@ -444,14 +491,13 @@ class ActionMenuView(discord.ui.View):
     @discord.ui.button(label="Itens", style=discord.ButtonStyle.gray)
     async def itens(self, interaction: Interaction, button: discord.ui.Button):
         # show player's consumables and let choose
-        players_db = load_players()
-        player = players_db.get(str(interaction.user.id))
+        player = player_store.get(interaction.user.id)
         if not player:
             return await interaction.response.send_message("Você não tem ficha.", ephemeral=True)
         inv = player.get("inventory", {})
         if not inv:
             return await interaction.response.send_message("Seu inventário está vazio.", ephemeral=True)
-        items_db = load_items()
+        items_db = catalogs.items()
         opts = []
         for k, q in inv.items():
             name = items_db.get(k, {}).get("nome", k)
@@ -493,18 +539,17 @@ class MonsterHitConfirmView(discord.ui.View):
             return await interaction.response.send_message("Já resolvido.", ephemeral=True)
         self.resolved = True
         # compute damage from attacker's equipped weapon
-        players_db = load_players()
-        player = players_db.get(str(self.attacker_id))
+        player = player_store.get(self.attacker_id)
         weapon_key = player.get("equip", {}).get("mao_direita")
-        equip_db = load_equip()
+        equip_db = catalogs.equipamentos()
         weapon = equip_db.get(weapon_key, {})
         damage_formula = weapon.get("dano", "1d4")
         dano = roll_dice(damage_formula)
         # apply damage
         apply_damage_to_monster(self.guild_id, self.monster_id, dano)
         # notify channel
-        ch = interaction.client.get_channel(active_combat[self.guild_id]["channel_id"])
-        await ch.send(f"🎯 {self.attacker_user.mention} acertou {active_combat[self.guild_id]['monsters'][self.monster_id]['nome']} #{self.monster_id} e causou **{dano}** de dano!")
+        ch = interaction.client.get_channel(active_combat[self.guild_id].channel_id)
+        await ch.send(f"🎯 {self.attacker_user.mention} acertou {active_combat[self.guild_id].monsters[self.monster_id].nome} #{self.monster_id} e causou **{dano}** de dano!")
         # now offer reactions to the target player (if target is a player)
         # if the monster attacks a player, we would prompt them; in this flow attacker attacked monster so no reflex needed
         await update_main_status(self.guild_id, interaction.client)
@@ -521,8 +566,8 @@ class MonsterHitConfirmView(discord.ui.View):
         if self.resolved:
             return await interaction.response.send_message("Já resolvido.", ephemeral=True)
         self.resolved = True
-        ch = interaction.client.get_channel(active_combat[self.guild_id]["channel_id"])
-        await ch.send(f"❌ {self.attacker_user.mention} errou o ataque em {active_combat[self.guild_id]['monsters'][self.monster_id]['nome']} #{self.monster_id}! Oportunidade gerada.")
+        ch = interaction.client.get_channel(active_combat[self.guild_id].channel_id)
+        await ch.send(f"❌ {self.attacker_user.mention} errou o ataque em {active_combat[self.guild_id].monsters[self.monster_id].nome} #{self.monster_id}! Oportunidade gerada.")
         # disable buttons
         for c in self.children:
             c.disabled = True
@@ -549,27 +594,25 @@ class ReactionView(discord.ui.View):
             return await interaction.response.send_message("Já resolveu.", ephemeral=True)
         self.resolved = True
         # simple reflex check: 1d20 + destreza vs DC 10 + monster-level
-        players_db = load_players()
-        player = players_db.get(str(self.player_id))
+        player = player_store.get(self.player_id)
         if not player:
             return await interaction.response.send_message("Ficha não encontrada.", ephemeral=True)
-        dex = int(player.get("atributos", {}).get("destreza", 0))
-        roll = random.randint(1,20) + dex
-        dc = 10 + int(active_combat[self.guild_id]["monsters"][self.monster_id].get("nivel",1))
+        stats = player_stats(player)
+        roll = random.randint(1,20) + stats.attr("destreza")
+        dc = 10 + active_combat[self.guild_id].monsters[self.monster_id].nivel
         if roll >= dc:
             # success: avoid full damage (half)
             mitig = math.floor(self.damage/2)
             # apply half damage
             # apply absorption first
-            absorv = player.get("absorv",0)
+            absorv = stats.absorv
             mitig_after_abs = max(0, mitig - absorv)
-            player["vida_atual"] = max(0, player.get("vida_atual",0) - mitig_after_abs)
-            save_players(players_db)
-            ch = interaction.client.get_channel(active_combat[self.guild_id]["channel_id"])
+            player_store.change_hp(self.player_id, -mitig_after_abs)
+            ch = interaction.client.get_channel(active_combat[self.guild_id].channel_id)
             await ch.send(f"🌀 {interaction.user.mention} fez Reflexo! Dano reduzido para {mitig_after_abs}. Vida atual: {player['vida_atual']}/{player['vida_max']}")
         else:
             # failed reflex: opportunity for others
-            ch = interaction.client.get_channel(active_combat[self.guild_id]["channel_id"])
+            ch = interaction.client.get_channel(active_combat[self.guild_id].channel_id)
             await ch.send(f"❌ {interaction.user.mention} falhou no Reflexo! Outros jogadores têm oportunidade de reação.")
             # send message to channel allowing others to react (simple ping)
             await ch.send("Outros jogadores: clique em **Atacar (Oportunidade)** se desejar (placeholder).")
@@ -589,13 +632,13 @@ class ReactionView(discord.ui.View):
     @discord.ui.button(label="Defender", style=discord.ButtonStyle.gray)
     async def defender(self, interaction: Interaction, button: discord.ui.Button):
         # apply temporary buff to CA for this player for 1 turn
-        players_db = load_players()
-        p = players_db.get(str(self.player_id))
+        p = player_store.get(self.player_id)
         if not p:
             return await interaction.response.send_message("Ficha não encontrada.", ephemeral=True)
         p.setdefault("buffs", []).append({"ca_mod": 4, "turns": 1})
-        save_players(players_db)
-        ch = interaction.client.get_channel(active_combat[self.guild_id]["channel_id"])
+        stats_cache.invalidate(p)
+        player_store.save(self.player_id)
+        ch = interaction.client.get_channel(active_combat[self.guild_id].channel_id)
         await ch.send(f"🛡️ {interaction.user.mention} se defende! CA aumentada temporariamente.")
         for c in self.children:
             c.disabled = True
@@ -606,15 +649,13 @@ class ReactionView(discord.ui.View):
 
     @discord.ui.button(label="Levar Dano", style=discord.ButtonStyle.danger)
     async def levar(self, interaction: Interaction, button: discord.ui.Button):
-        players_db = load_players()
-        p = players_db.get(str(self.player_id))
+        p = player_store.get(self.player_id)
         if not p:
             return await interaction.response.send_message("Ficha não encontrada.", ephemeral=True)
-        absorv = p.get("absorv", 0)
+        absorv = player_stats(p).absorv
         dano_final = max(0, self.damage - absorv)
-        p["vida_atual"] = max(0, p.get("vida_atual",0) - dano_final)
-        save_players(players_db)
-        ch = interaction.client.get_channel(active_combat[self.guild_id]["channel_id"])
+        player_store.change_hp(self.player_id, -dano_final)
+        ch = interaction.client.get_channel(active_combat[self.guild_id].channel_id)
         await ch.send(f"💥 {interaction.user.mention} recebeu {dano_final} de dano (após absorção). Vida atual: {p['vida_atual']}/{p['vida_max']}")
         for c in self.children:
             c.disabled = True
@@ -630,25 +671,24 @@ async def monster_attack_flow(guild_id: int, monster_id: int, bot: commands.Bot)
     data = active_combat.get(guild_id)
     if not data:
         return
-    monster = data["monsters"].get(monster_id)
+    monster = data.monsters.get(monster_id)
     if not monster:
         return
     # choose a random alive player
-    players = data.get("players", {})
+    players = data.players
     alive_players = [pid for pid,p in players.items() if p.get("vida_atual",0) > 0]
     if not alive_players:
-        ch = bot.get_channel(data["channel_id"])
+        ch = bot.get_channel(data.channel_id)
         await ch.send("Nenhum jogador vivo para atacar.")
         return
     target_pid = int(random.choice(alive_players))
     # roll attack and damage
     d20 = random.randint(1,20)
-    bba = int(monster.get("bba", 0))
+    bba = monster.bba
     total = d20 + bba
-    dmg_formula = monster.get("dano", "1d4")
-    dmg = roll_dice(dmg_formula)
-    ch = bot.get_channel(data["channel_id"])
-    embed = discord.Embed(title=f"{monster.get('nome')} #{monster_id} ataca!", description=f"Rolagem: 1d20 → **{d20}** + BBA **{bba}** = **{total}**\nDano (pré-rolado): **{dmg}**", color=discord.Color.red())
+    dmg = roll_dice(monster.dano)
+    ch = bot.get_channel(data.channel_id)
+    embed = discord.Embed(title=f"{monster.nome} #{monster_id} ataca!", description=f"Rolagem: 1d20 → **{d20}** + BBA **{bba}** = **{total}**\nDano (pré-rolado): **{dmg}**", color=discord.Color.red())
     embed.add_field(name="Alvo", value=f"<@{target_pid}>")
     view = ReactionView(guild_id, target_pid, monster_id, dmg)
     await ch.send(embed=embed, view=view)
@@ -1,46 +1,36 @@
 # cogs/dice_roll.py
 
+import asyncio
+
 import discord
 from discord.ext import commands
 from discord import app_commands
-import random
-import re
+
+from typing import Optional
+
+from utils.dice import compile_dice, distribution, estimate_distribution, exact_distribution_ok
 
 
 # =====================================================
 # Interpreta expressão como "1d20 + 2 Percepção"
 # =====================================================
 def parse_dice(expression: str):
+    """Retorna (RollPlan, nome). O nome é a última palavra, se ela não fizer parte da fórmula."""
     tokens = expression.split()
-    last_token = tokens[-1]
-
-    if not re.search(r"\d+d\d+", last_token):
-        nome = last_token
-        formula = " ".join(tokens[:-1])
-    else:
-        nome = None
-        formula = expression
+    try:
+        plan, nome = compile_dice(expression), None
+    except ValueError:
+        if len(tokens) < 2:
+            raise ValueError("Formato inválido. Use algo como: 1d20 + 2 Percepção")
+        nome = tokens[-1]
+        try:
+            plan = compile_dice(" ".join(tokens[:-1]))
+        except ValueError:
+            raise ValueError("Formato inválido. Use algo como: 1d20 + 2 Percepção")
 
-    match = re.search(r"(\d+)d(\d+)", formula)
-    if not match:
+    if not plan.terms:
         raise ValueError("Formato inválido. Use algo como: 1d20 + 2 Percepção")
-
-    qtd = int(match.group(1))
-    faces = int(match.group(2))
-
-    modificador = 0
-    mod_match = re.search(r"([+\-]\s*\d+)", formula)
-    if mod_match:
-        modificador = int(mod_match.group(1).replace(" ", ""))
-
-    return qtd, faces, modificador, nome
-
-
-# =====================================================
-# Rola dados (simples)
-# =====================================================
-def roll_dice(qtd, faces):
-    return [random.randint(1, faces) for _ in range(qtd)]
+    return plan, nome
 
 
 # =====================================================
@@ -76,7 +66,7 @@ class DiceRoll(commands.Cog):
         # PARSE DA EXPRESSÃO
         # =====================================================
         try:
-            qtd, faces, modificador, nome = parse_dice(expressao)
+            plan, nome = parse_dice(expressao)
         except Exception as e:
             return await interaction.response.send_message(f"❌ Erro: {e}", ephemeral=True)
 
@@ -86,18 +76,18 @@ class DiceRoll(commands.Cog):
         modo = modo.value
 
         if modo == "normal":
-            rolls = roll_dice(qtd, faces)
+            rolls = plan.roll_dice()
 
         elif modo == "vantagem":
             # rola 2 vezes, pega maior d20 (modo D&D)
-            r1 = roll_dice(qtd, faces)
-            r2 = roll_dice(qtd, faces)
+            r1 = plan.roll_dice()
+            r2 = plan.roll_dice()
             rolls = r1 if sum(r1) >= sum(r2) else r2
             rolls.extend(["(vantagem)", r1, r2])  # incluir info extra
 
         elif modo == "desvantagem":
-            r1 = roll_dice(qtd, faces)
-            r2 = roll_dice(qtd, faces)
+            r1 = plan.roll_dice()
+            r2 = plan.roll_dice()
             rolls = r1 if sum(r1) <= sum(r2) else r2
             rolls.extend(["(desvantagem)", r1, r2])
 
@@ -111,7 +101,7 @@ class DiceRoll(commands.Cog):
         else:
             soma = 0
 
-        resultado_final = soma + modificador
+        resultado_final = soma + plan.modifier
 
         # =====================================================
         # Checagem de crítico/falha
@@ -120,7 +110,7 @@ class DiceRoll(commands.Cog):
         critico = False
         falha = False
 
-        if qtd == 1 and faces == 20:
+        if plan.is_d20:
             roll = rolls[0]
             if roll == 20:
                 critico = True
@@ -193,6 +183,58 @@ class DiceRoll(commands.Cog):
         # =====================================================
         await interaction.response.send_message(embed=embed)
 
+    # =====================================================
+    # /rolar_estatisticas — distribuição exata da expressão
+    # =====================================================
+    @app_commands.command(
+        name="rolar_estatisticas",
+        description="Mostra média, desvio e percentis de uma expressão (ex: 2d8+3, 4d6kh3)"
+    )
+    @app_commands.describe(
+        expressao="Ex: 2d8+3 ou 1d20+5",
+        alvo="Opcional: chance de tirar pelo menos este valor (ex: a CA do alvo)"
+    )
+    async def rolar_estatisticas(self, interaction: discord.Interaction, expressao: str, alvo: Optional[int] = None):
+        try:
+            plan, nome = parse_dice(expressao)
+        except ValueError as e:
+            return await interaction.response.send_message(f"❌ Erro: {e}", ephemeral=True)
+
+        # cálculo exato quando é barato; senão, estimativa por amostragem.
+        # Os dois rodam numa thread para não travar o bot (e o prazo de 3 s da interação)
+        exato = exact_distribution_ok(plan)
+        await interaction.response.defer(thinking=True)
+        try:
+            dist = await asyncio.to_thread(distribution if exato else estimate_distribution, plan.expression)
+        except ValueError as e:
+            return await interaction.followup.send(f"❌ Erro: {e}")
+
+        titulo = "📈 Estatísticas da rolagem"
+        if nome:
+            titulo += f" — **{nome}**"
+        embed = discord.Embed(title=titulo, color=discord.Color.blurple())
+
+        embed.add_field(name="🧮 Fórmula", value=f"`{plan.expression}`", inline=False)
+        embed.add_field(name="Mínimo / Máximo", value=f"{dist.min} / {dist.max}", inline=True)
+        embed.add_field(name="Média", value=f"{dist.mean:.2f}", inline=True)
+        embed.add_field(name="Desvio padrão", value=f"{dist.std:.2f}", inline=True)
+
+        percentis = " | ".join(f"p{q}: **{dist.percentile(q)}**" for q in (10, 25, 50, 75, 90))
+        embed.add_field(name="📊 Percentis", value=percentis, inline=False)
+
+        if alvo is not None:
+            chance = dist.prob_at_least(alvo)
+            if plan.is_d20:
+                # 1 natural sempre erra, 20 natural sempre acerta
+                nat = 1 / plan.terms[0].faces
+                chance = min(max(chance, nat), 1 - nat)
+            embed.add_field(name=f"🎯 Chance de ≥ {alvo}", value=f"**{chance * 100:.1f}%**", inline=False)
+
+        if not exato:
+            embed.set_footer(text="Valores estimados por amostragem (expressão grande demais para o cálculo exato).")
+
+        await interaction.followup.send(embed=embed)
+
 
 async def setup(bot):
     await bot.add_cog(DiceRoll(bot))
@@ -28,6 +28,7 @@ class HelpCog(commands.Cog):
         embed.add_field(name="⚔️ Combate", value=(
             "/combate_iniciar - iniciar combate (novo sistema)\n"
             "/combate_status - atualizar embed do combate\n"
+            "/magia_area - conjurar magia em área (rank com área)\n"
             "/combate_encerrar - encerrar combate\n"
         ), inline=False)
         await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -1,21 +1,8 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 
-ITEMS_PATH = "./data/items.json"
-
-def load_items():
-    if not os.path.exists(ITEMS_PATH):
-        with open(ITEMS_PATH, "w", encoding="utf8") as f:
-            json.dump({}, f, indent=4, ensure_ascii=False)
-    with open(ITEMS_PATH, "r", encoding="utf8") as f:
-        return json.load(f)
-
-def save_items(data):
-    with open(ITEMS_PATH, "w", encoding="utf8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+from utils import catalogs
 
 class ItemAdmin(commands.Cog):
     def __init__(self, bot):
@@ -40,7 +27,7 @@ class ItemAdmin(commands.Cog):
         if tipo not in ("hp", "mana", "buff", "craft"):
             return await interaction.response.send_message("Tipo inválido. Use 'hp', 'mana', 'buff' ou 'craft'.", ephemeral=True)
 
-        items = load_items()
+        items = catalogs.items.load_mutable()
         if key in items:
             return await interaction.response.send_message("Já existe um item com essa chave.", ephemeral=True)
 
@@ -50,12 +37,12 @@ class ItemAdmin(commands.Cog):
             "valor": int(valor),
             "descricao": descricao
         }
-        save_items(items)
+        catalogs.items.replace(items)
         await interaction.response.send_message(f"✅ Item **{nome}** criado com chave `{key}`.")
 
     @app_commands.command(name="item_listar", description="Lista itens disponíveis.")
     async def listar(self, interaction: discord.Interaction):
-        items = load_items()
+        items = catalogs.items()
         if not items:
             return await interaction.response.send_message("Nenhum item cadastrado.", ephemeral=True)
 
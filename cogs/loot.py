@@ -6,173 +6,46 @@
 import discord
 from discord.ext import commands
 from discord import app_commands, Interaction
-import json
-import os
-import random
 import math
 
-# paths
-PLAYERS_PATH = "./data/players.json"
-RANKS_PLAYER_PATH = "./data/ranks_player.json"
-ITEMS_PATH = "./data/items.json"
-MONSTERS_PATH = "./data/monsters.json"
+from utils.storage import player_store
+from utils import catalogs
+from utils.autocomplete import autocomplete_items, autocomplete_inventario
+from utils.loot_tables import loot_tables
 
 # import active_combat do combate.py
 try:
-    from cogs.combate import active_combat, update_main_status
+    from cogs.combate import active_combat, update_main_status, _add_fields
 except Exception:
     active_combat = {}
     def update_main_status(*args, **kwargs):
         return
+    _add_fields = None  # sem combate não há loot para exibir
 
 # ----------------------------------------------------
-# JSON HELPERS
+# GERAR DROPS PARA CADA MONSTRO (LÓGICA COMPLETA)
 # ----------------------------------------------------
-def load_json(path, default=None):
-    if default is None:
-        default = {}
-    if not os.path.exists(path):
-        with open(path, "w", encoding="utf8") as f:
-            json.dump(default, f, indent=4, ensure_ascii=False)
-    with open(path, "r", encoding="utf8") as f:
-        return json.load(f)
-
-def save_json(path, data):
-    with open(path, "w", encoding="utf8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
-
-def load_players():
-    return load_json(PLAYERS_PATH)
-
-def save_players(data):
-    save_json(PLAYERS_PATH, data)
-
-def load_items():
-    return load_json(ITEMS_PATH)
-
-def load_monsters():
-    return load_json(MONSTERS_PATH)
-
-def load_ranks_player():
-    return load_json(RANKS_PLAYER_PATH)
+def gerar_drop_monstro(mon_key: str, mon_data: dict):
+    """Retorna XP, drops e special rolls (tabelas compiladas em utils/loot_tables.py)."""
+    return loot_tables.roll(mon_key, mon_data)
 
 # ----------------------------------------------------
-# ROLAGENS
+# DIVISÃO DOS DROPS ENTRE OS JOGADORES
 # ----------------------------------------------------
-def roll_dice(formula: str) -> int:
-    # exemplo "1d4", "2d6+1"
-    import re
-    s = formula.replace(" ", "")
-    m = re.match(r"(\d+)d(\d+)([+\-]\d+)?", s)
-    if not m:
-        try:
-            return int(s)
-        except:
-            return 0
-    n = int(m.group(1))
-    faces = int(m.group(2))
-    mod = int(m.group(3) or 0)
-    total = 0
-    for _ in range(n):
-        total += random.randint(1, faces)
-    return total + mod
+# onde começa a próxima sobra, por guild (continua entre tipos de item e entre /gerar_loot)
+_loot_offset = {}
 
-# ----------------------------------------------------
-# GERAR DROPS PARA CADA MONSTRO (LÓGICA COMPLETA)
-# ----------------------------------------------------
-def gerar_drop_monstro(mon_key: str, mon_data: dict):
-    """Retorna XP, drops e special rolls."""
-    results = {
-        "xp": 0,
-        "drops": [],
-        "special_rolls": []
-    }
-
-    ranks_player = load_ranks_player()
-    rank = mon_data.get("rank", "bronze").lower()
-    nivel = str(mon_data.get("nivel", 1))
-
-    # XP baseado no ranks_player.json
-    xp = 0
-    if rank in ranks_player and nivel in ranks_player[rank]:
-        xp = int(ranks_player[rank][nivel].get("qi_xp", 0))
-    results["xp"] = xp
-
-    monsters_db = load_monsters()
-
-    # descobrir key correta no banco de monstros
-    real_key = None
-    for key, info in monsters_db.items():
-        if info.get("nome", "").lower() == mon_data.get("nome", "").lower():
-            real_key = key
-            break
-        if key.lower() == mon_key.lower():
-            real_key = key
-            break
-
-    if real_key is None:
-        real_key = mon_key.lower()
-
-    # ----------------------------- 
-    # REGRA ESPECIAL CARNEIRO
-    # -----------------------------
-    if "carneir" in real_key:
-        # 1d4 cascos (sempre)
-        qtd_cascos = roll_dice("1d4")
-        results["drops"].append({
-            "item": "cascos",
-            "nome": "Cascos",
-            "quant": qtd_cascos,
-            "chance": 1.0
-        })
-
-        # pele (70%)
-        if random.random() <= 0.70:
-            results["drops"].append({
-                "item": "pele",
-                "nome": "Pele",
-                "quant": 1,
-                "chance": 0.70
-            })
-
-        # esfera bestial (1d100 >= 90)
-        roll_100 = random.randint(1, 100)
-        results["special_rolls"].append({
-            "item": "esfera_bestial",
-            "roll": roll_100,
-            "needed": 90,
-            "won": roll_100 >= 90
-        })
-        if roll_100 >= 90:
-            results["drops"].append({
-                "item": "esfera_bestial",
-                "nome": "Esfera Bestial",
-                "quant": 1,
-                "chance": 0.10
-            })
-
-        return results
-
-    # -----------------------------
-    # DROPS DEFINIDOS NO monsters.json
-    # -----------------------------
-    if real_key in monsters_db:
-        drop_cfg = monsters_db[real_key].get("drops", [])
-        for d in drop_cfg:
-            item = d.get("item")
-            qtd_formula = d.get("q", "1")
-            chance = float(d.get("chance", 1.0))
-            if random.random() <= chance:
-                quant = roll_dice(qtd_formula)
-                if quant > 0:
-                    results["drops"].append({
-                        "item": item,
-                        "nome": item.capitalize(),
-                        "quant": quant,
-                        "chance": chance
-                    })
-
-    return results
+
+def split_quantity(qty: int, n: int, offset: int = 0):
+    """
+    Divide qty entre n jogadores: todos recebem qty // n e a sobra vai para
+    os jogadores a partir de `offset`. Retorna (partes, próximo offset).
+    """
+    base, rest = divmod(int(qty), n)
+    shares = [base] * n
+    for i in range(rest):
+        shares[(offset + i) % n] += 1
+    return shares, (offset + rest) % n
 
 # ----------------------------------------------------
 # COG LOOT
@@ -196,10 +69,10 @@ class LootCog(commands.Cog):
             return await interaction.response.send_message("Nenhum combate ativo.", ephemeral=True)
 
         combate = active_combat[gid]
-        monsters = combate.get("monsters", {})
-        players_snapshot = combate.get("players", {})
+        monsters = combate.monsters
+        players_snapshot = combate.players
 
-        dead = [ (mid, m) for mid, m in monsters.items() if m.get("vida_atual",1) <= 0 ]
+        dead = [(mid, monsters[mid]) for mid in monsters.dead_ids()]
         if not dead:
             return await interaction.response.send_message("Nenhum inimigo morto.", ephemeral=True)
 
@@ -207,19 +80,24 @@ class LootCog(commands.Cog):
         total_drops = {}
         players_list = list(players_snapshot.keys())
 
-        players_db = load_players()
-        items_db = load_items()
+        players_db = player_store.all()
+        items_db = catalogs.items()
 
-        log_details = []
+        # por tipo de monstro: [quantidade, XP] (hordas geram centenas de mortos)
+        xp_por_tipo = {}
+        # por rolagem especial (item, fórmula, mínimo): [rolagens, vitórias, último resultado]
+        especiais = {}
 
-        # Processar cada inimigo morto
+        # Processar cada inimigo morto (só sorteia; nada é gravado até o embed estar pronto)
         for mid, mon in dead:
-            mon_key = mon.get("nome","monstro").lower()
+            mon_key = mon.nome.lower()
             info = gerar_drop_monstro(mon_key, mon)
             xp = info.get("xp", 0)
             total_xp += xp
 
-            log_details.append(f"**{mon['nome']} #{mid}** → XP: {xp}")
+            tipo = xp_por_tipo.setdefault(mon.nome, [0, 0])
+            tipo[0] += 1
+            tipo[1] += xp
 
             # drops
             for d in info.get("drops", []):
@@ -229,15 +107,45 @@ class LootCog(commands.Cog):
 
             # especiais (como esfera bestial)
             for sr in info.get("special_rolls", []):
+                key = (sr.get("item"), sr.get("formula", "1d100"), sr["needed"])
+                acc = especiais.setdefault(key, [0, 0, 0])
+                acc[0] += 1
+                acc[1] += 1 if sr["won"] else 0
+                acc[2] = sr["roll"]
+
+        log_details = [f"**{n}x {nome}** → XP: {xp}\n" for nome, (n, xp) in xp_por_tipo.items()]
+        for (item, formula, needed), (n, wins, last) in especiais.items():
+            if n == 1:
                 log_details.append(
-                    f"🎲 Rolou 1d100: **{sr['roll']}** (Precisa ≥ {sr['needed']}) → {'GANHOU' if sr['won'] else 'NÃO GANHOU'}"
+                    f"🎲 Rolou {formula}: **{last}** (Precisa ≥ {needed}) → {'GANHOU' if wins else 'NÃO GANHOU'}\n"
                 )
+            else:
+                nome = items_db.get(item, {}).get("nome", item)
+                log_details.append(f"🎲 {n}x {formula} ≥ {needed} ({nome}) → {wins} ganharam\n")
+
+        xp_each = math.floor(total_xp / max(1, len(players_list)))
 
         # ==========================================
-        # Distribuir XP igualmente
+        # EMBED RESULTANTE (montado antes de distribuir: se falhar, ninguém recebe nada)
         # ==========================================
-        xp_each = math.floor(total_xp / max(1, len(players_list)))
+        embed = discord.Embed(
+            title="🎁 Loot do Combate",
+            color=discord.Color.gold()
+        )
+
+        embed.add_field(name="XP Total", value=str(total_xp), inline=True)
+        embed.add_field(name="XP por Jogador", value=str(xp_each), inline=True)
+
+        # campos divididos nos limites do Discord (1024 por campo, 6000 por mensagem)
+        embeds = [embed]
+        drops_txt = [f"• **{info['nome']}** x{info['quant']}\n" for info in total_drops.values()]
+        _add_fields(embeds, "Drops Totais", drops_txt, "Nenhum drop.")
+        if log_details:
+            _add_fields(embeds, "Detalhes", log_details, "")
 
+        # ==========================================
+        # Distribuir XP igualmente
+        # ==========================================
         if players_list:
             for pid in players_list:
                 if pid not in players_db:
@@ -247,55 +155,29 @@ class LootCog(commands.Cog):
                         "mana_max":1,"mana_atual":1,
                         "coins":0, "inventory":{}, "xp":0
                     }
-                players_db[pid]["xp"] = players_db[pid].get("xp", 0) + xp_each
+                    player_store.save(pid)
+                player_store.add_xp(pid, xp_each, field="xp")
 
         # ==========================================
-        # Distribuir drops round-robin para inventários
+        # Distribuir drops: divisão igual + sobra rotativa
         # ==========================================
-        for item_key, info in total_drops.items():
-            qty = info["quant"]
-            idx = 0
-            while qty > 0 and players_list:
-                pid = players_list[idx % len(players_list)]
-                inv = players_db[pid].setdefault("inventory", {})
-                inv[item_key] = inv.get(item_key, 0) + 1
-                qty -= 1
-                idx += 1
-
-        save_players(players_db)
-
-        # ==========================================
-        # EMBED RESULTANTE
-        # ==========================================
-        embed = discord.Embed(
-            title="🎁 Loot do Combate",
-            color=discord.Color.gold()
-        )
-
-        embed.add_field(name="XP Total", value=str(total_xp), inline=True)
-        embed.add_field(name="XP por Jogador", value=str(xp_each), inline=True)
-
-        if total_drops:
-            txt = ""
-            for ik, info in total_drops.items():
-                nome = info["nome"]
-                quant = info["quant"]
-                txt += f"• **{nome}** x{quant}\n"
-            embed.add_field(name="Drops Totais", value=txt, inline=False)
-        else:
-            embed.add_field(name="Drops Totais", value="Nenhum drop.", inline=False)
-
-        if log_details:
-            embed.add_field(name="Detalhes", value="\n".join(log_details), inline=False)
-
-        await interaction.response.send_message(embed=embed)
+        if players_list:
+            offset = _loot_offset.get(gid, 0)
+            for item_key, info in total_drops.items():
+                shares, offset = split_quantity(info["quant"], len(players_list), offset)
+                for pid, share in zip(players_list, shares):
+                    if share:
+                        player_store.add_item(pid, item_key, share)
+            _loot_offset[gid] = offset
+
+        await interaction.response.send_message(embeds=embeds)
     # ==========================================================
     # /loja — catálogo completo de itens do items.json
     # ==========================================================
     @app_commands.command(name="loja", description="Mostra a vitrine completa de itens disponíveis.")
     async def loja(self, interaction: Interaction):
 
-        items_db = load_items()
+        items_db = catalogs.items()
         if not items_db:
             return await interaction.response.send_message("Nenhum item cadastrado na loja.", ephemeral=True)
 
@@ -329,9 +211,10 @@ class LootCog(commands.Cog):
     # /comprar — comprar itens
     # ==========================================================
     @app_commands.command(name="comprar", description="Compra um item da loja usando coins.")
+    @app_commands.autocomplete(item_key=autocomplete_items)
     async def comprar(self, interaction: Interaction, item_key: str, quantidade: int = 1):
 
-        items_db = load_items()
+        items_db = catalogs.items()
         if item_key not in items_db:
             return await interaction.response.send_message("Item não encontrado.", ephemeral=True)
 
@@ -342,7 +225,7 @@ class LootCog(commands.Cog):
         price = int(item.get("buy", 0))
         total = price * quantidade
 
-        players = load_players()
+        players = player_store.all()
         key = str(interaction.user.id)
 
         if key not in players:
@@ -352,13 +235,10 @@ class LootCog(commands.Cog):
             return await interaction.response.send_message("Você não tem coins suficientes.", ephemeral=True)
 
         # Deduz coins
-        players[key]["coins"] -= total
+        player_store.add_coins(key, -total)
 
         # Adiciona ao inventário
-        inv = players[key].setdefault("inventory", {})
-        inv[item_key] = inv.get(item_key, 0) + quantidade
-
-        save_players(players)
+        player_store.add_item(key, item_key, quantidade)
 
         await interaction.response.send_message(
             f"🛒 Você comprou **{quantidade}x** `{item.get('nome', item_key)}` por **{total} coins**!"
@@ -368,12 +248,13 @@ class LootCog(commands.Cog):
     # /vender — vender itens
     # ==========================================================
     @app_commands.command(name="vender", description="Vende um item do inventário.")
+    @app_commands.autocomplete(item_key=autocomplete_inventario)
     async def vender(self, interaction: Interaction, item_key: str, quantidade: int = 1):
 
         if quantidade < 1:
             return await interaction.response.send_message("Quantidade deve ser maior que 0.", ephemeral=True)
 
-        items_db = load_items()
+        items_db = catalogs.items()
         if item_key not in items_db:
             return await interaction.response.send_message("Item não encontrado.", ephemeral=True)
 
@@ -381,7 +262,7 @@ class LootCog(commands.Cog):
         price = int(item.get("sell", 0))
         total = price * quantidade
 
-        players = load_players()
+        players = player_store.all()
         key = str(interaction.user.id)
 
         if key not in players:
@@ -392,13 +273,10 @@ class LootCog(commands.Cog):
             return await interaction.response.send_message("Você não possui essa quantidade para vender.", ephemeral=True)
 
         # Remover item
-        inv[item_key] -= quantidade
-        if inv[item_key] <= 0:
-            del inv[item_key]
+        player_store.add_item(key, item_key, -quantidade)
 
         # Adicionar coins
-        players[key]["coins"] += total
-        save_players(players)
+        player_store.add_coins(key, total)
 
         await interaction.response.send_message(
             f"🪙 Você vendeu **{quantidade}x** `{item.get('nome', item_key)}` e recebeu **{total} coins**!"
@@ -409,16 +287,17 @@ class LootCog(commands.Cog):
     # ==========================================================
     @app_commands.command(name="dar_item", description="(ADM) Entrega um item manualmente a um jogador.")
     @app_commands.checks.has_permissions(manage_guild=True)
+    @app_commands.autocomplete(item_key=autocomplete_items)
     async def dar_item(self, interaction: Interaction, jogador: discord.Member, item_key: str, quantidade: int = 1):
 
-        items_db = load_items()
+        items_db = catalogs.items()
         if item_key not in items_db:
             return await interaction.response.send_message("Item não existe.", ephemeral=True)
 
         if quantidade < 1:
             return await interaction.response.send_message("Quantidade inválida.", ephemeral=True)
 
-        players = load_players()
+        players = player_store.all()
         key = str(jogador.id)
 
         if key not in players:
@@ -433,11 +312,9 @@ class LootCog(commands.Cog):
                 "inventory": {},
                 "xp": 0
             }
+            player_store.save(key)
 
-        inv = players[key].setdefault("inventory", {})
-        inv[item_key] = inv.get(item_key, 0) + quantidade
-
-        save_players(players)
+        player_store.add_item(key, item_key, quantidade)
 
         await interaction.response.send_message(
             f"🎁 Entregue **{quantidade}x {items_db[item_key]['nome']}** para {jogador.mention}."
@@ -453,7 +330,7 @@ class LootCog(commands.Cog):
         if valor < 0:
             return await interaction.response.send_message("Valor inválido.", ephemeral=True)
 
-        players = load_players()
+        players = player_store.all()
         key = str(jogador.id)
 
         if key not in players:
@@ -468,10 +345,9 @@ class LootCog(commands.Cog):
                 "inventory": {},
                 "xp": 0
             }
+            player_store.save(key)
         else:
-            players[key]["coins"] = valor
-
-        save_players(players)
+            player_store.set_coins(key, valor)
 
         await interaction.response.send_message(
             f"💰 {jogador.mention} agora possui **{valor} coins**!"
@@ -485,7 +361,7 @@ class LootCog(commands.Cog):
 
         user = jogador or interaction.user
         key = str(user.id)
-        players = load_players()
+        players = player_store.all()
 
         if key not in players:
             return await interaction.response.send_message("Este jogador não possui ficha.", ephemeral=True)
@@ -493,7 +369,7 @@ class LootCog(commands.Cog):
         p = players[key]
         inv = p.get("inventory", {})
         coins = p.get("coins", 0)
-        items_db = load_items()
+        items_db = catalogs.items()
 
         embed = discord.Embed(
             title=f"🎒 Inventário de {user.display_name}",
@@ -1,35 +1,16 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
 
-
-# ======================
-# Funções para JSON
-# ======================
-def load_monsters():
-    with open("./data/monsters.json", "r", encoding="utf8") as f:
-        return json.load(f)
-
-
-def save_monsters(data):
-    with open("./data/monsters.json", "w", encoding="utf8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+from utils import catalogs
+from utils.autocomplete import monsters_index
 
 
 # ======================
 # AUTOCOMPLETE
 # ======================
 async def autocomplete_monstros(interaction: discord.Interaction, current: str):
-    db = load_monsters()
-    nomes = list(db.keys())
-
-    sugestões = [n for n in nomes if current.lower() in n.lower()]
-
-    return [
-        app_commands.Choice(name=name.capitalize(), value=name)
-        for name in sugestões[:25]
-    ]
+    return monsters_index.choices(current)
 
 
 # ======================
@@ -53,7 +34,7 @@ class MonsterAdmin(commands.Cog):
     ):
 
         nome_key = nome.lower()
-        db = load_monsters()
+        db = catalogs.monsters.load_mutable()
 
         if nome_key in db:
             return await interaction.response.send_message(
@@ -66,7 +47,7 @@ class MonsterAdmin(commands.Cog):
             "img": imagem_url
         }
 
-        save_monsters(db)
+        catalogs.monsters.replace(db)
 
         await interaction.response.send_message(
             f"✅ Monstro **{nome.capitalize()}** criado com sucesso!"
@@ -80,7 +61,7 @@ class MonsterAdmin(commands.Cog):
         description="Lista todos os monstros cadastrados no JSON."
     )
     async def listar(self, interaction: discord.Interaction):
-        db = load_monsters()
+        db = catalogs.monsters()
 
         if not db:
             return await interaction.response.send_message(
@@ -121,7 +102,7 @@ class MonsterAdmin(commands.Cog):
         nome_key = nome.lower()
         atributo = atributo.lower()
 
-        db = load_monsters()
+        db = catalogs.monsters.load_mutable()
 
         if nome_key not in db:
             return await interaction.response.send_message(
@@ -138,7 +119,7 @@ class MonsterAdmin(commands.Cog):
         # atualiza
         db[nome_key][atributo] = valor
 
-        save_monsters(db)
+        catalogs.monsters.replace(db)
 
         await interaction.response.send_message(
             f"✅ Monstro **{nome.capitalize()}** atualizado.\n"
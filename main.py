@@ -1,14 +1,23 @@
 import discord
 from discord.ext import commands
 import asyncio
+import hashlib
+import json
 import os
+import time
 from dotenv import load_dotenv
 
+from utils.storage import json_writer, write_text_atomic
+from utils.grid import close_session, shutdown_executor
+
 # Load .env
 load_dotenv()
 
 TOKEN = os.getenv("DISCORD_TOKEN")
 
+# hash da última árvore de comandos enviada ao Discord
+COMMAND_HASH_PATH = "./data/command_tree.sha256"
+
 INTENTS = discord.Intents.default()
 INTENTS.message_content = True
 INTENTS.members = True
@@ -33,28 +42,73 @@ COGS = [
     "cogs.loot"
 ]
 
-@bot.event
-async def on_ready():
-    print(f"🤖 Bot conectado como {bot.user}")
+def command_tree_hash() -> str:
+    payload = []
+    for cmd in bot.tree.get_commands():
+        try:
+            payload.append(cmd.to_dict(bot.tree))
+        except TypeError:
+            # discord.py < 2.4
+            payload.append(cmd.to_dict())
+    payload.sort(key=lambda c: (c.get("type", 1), c["name"]))
+    data = json.dumps({"app": bot.application_id, "commands": payload}, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf8")).hexdigest()
+
+
+async def sync_commands_if_changed():
+    current = command_tree_hash()
+    try:
+        with open(COMMAND_HASH_PATH, "r", encoding="utf8") as f:
+            previous = f.read().strip()
+    except OSError:
+        previous = None
+    if current == previous:
+        print("🔧 Comandos / sem mudanças; sync ignorado.")
+        return
     print("Sincronizando comandos / ...")
     try:
         synced = await bot.tree.sync()
         print(f"🔧 {len(synced)} comandos sincronizados.")
     except Exception as e:
         print(f"Erro ao sincronizar comandos: {e}")
+        return
+    # atômico: um crash no meio não deixa um hash truncado para o próximo start
+    write_text_atomic(COMMAND_HASH_PATH, current)
+
+
+_commands_checked = False
+
+
+@bot.event
+async def on_ready():
+    # on_ready dispara de novo a cada reconexão; a árvore só é conferida uma vez
+    global _commands_checked
+    print(f"🤖 Bot conectado como {bot.user}")
+    if not _commands_checked:
+        _commands_checked = True
+        await sync_commands_if_changed()
     print("✨ Bot está pronto!")
 
 async def load_cogs():
+    inicio = time.perf_counter()
     for cog in COGS:
+        t0 = time.perf_counter()
         try:
             await bot.load_extension(cog)
-            print(f"📦 Cog carregada: {cog}")
+            print(f"📦 Cog carregada: {cog} ({(time.perf_counter() - t0) * 1000:.0f} ms)")
         except Exception as e:
             print(f"❌ Erro ao carregar {cog}: {e}")
+    print(f"📦 {len(COGS)} cogs em {(time.perf_counter() - inicio) * 1000:.0f} ms")
 
 async def main():
     await load_cogs()
-    await bot.start(TOKEN)
+    try:
+        await bot.start(TOKEN)
+    finally:
+        # grava o que ainda estiver pendente antes de sair
+        await json_writer.flush()
+        await close_session()
+        shutdown_executor()
 
 if __name__ == "__main__":
     asyncio.run(main())
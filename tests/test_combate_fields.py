@@ -0,0 +1,37 @@
+import discord
+
+from cogs.combate import FIELD_LIMIT, MAX_FIELDS, _add_fields
+
+
+def _check_limits(embeds):
+    assert sum(len(e) for e in embeds) <= 6000
+    for e in embeds:
+        assert len(e.fields) <= MAX_FIELDS
+        assert all(len(f.value) <= FIELD_LIMIT for f in e.fields)
+
+
+def test_overflow_marker_on_a_full_page():
+    # página que já tem 24 campos: os blocos seguintes não podem virar o 26º campo
+    embed = discord.Embed(title="Status")
+    for i in range(MAX_FIELDS - 1):
+        embed.add_field(name=str(i), value="x")
+    embeds = [embed]
+    _add_fields(embeds, "Inimigos", [f"Monstro #{i}: " + "█" * 600 + "\n" for i in range(40)], "—")
+    _check_limits(embeds)
+    assert embeds[-1].fields[-1].value.startswith("… e mais")
+
+
+def test_overflow_marker_with_25_fields_already_used():
+    embed = discord.Embed(title="Status")
+    for i in range(MAX_FIELDS):
+        embed.add_field(name=str(i), value="x" * 230)
+    embeds = [embed]
+    _add_fields(embeds, "Jogadores", ["y" * 600 + "\n" for _ in range(30)], "—")
+    _check_limits(embeds)
+    assert embeds[-1].fields[-1].value.startswith("… e mais")
+
+
+def test_many_small_blocks():
+    embeds = [discord.Embed(title="Status")]
+    _add_fields(embeds, "Inimigos", [f"#{i}\n" for i in range(3000)], "—")
+    _check_limits(embeds)
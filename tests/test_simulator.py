@@ -0,0 +1,35 @@
+import pytest
+
+from utils import simulator
+
+
+def _enc(quantidade, jogadores):
+    return {
+        "quantidade": quantidade, "monster_vida": 5, "monster_ca": 10, "monster_bba": 0, "monster_dano": "1d4",
+        "jogadores": jogadores, "player_hp": 10, "player_qi": 0, "player_ataque": 0, "player_ca": 10,
+        "player_absorv": 0, "player_dano": "1d6",
+    }
+
+
+@pytest.mark.parametrize("quantidade, jogadores, encontros", [
+    (simulator.MAX_MONSTERS + 1, 1, 1),
+    (1, simulator.MAX_PLAYERS + 1, 1),
+    (1, 1, simulator.MAX_ENCOUNTERS + 1),
+    (1, 1, 0),
+    (100000, 1, 100000),
+    (simulator.MAX_MONSTERS, simulator.MAX_PLAYERS, simulator.MAX_ENCOUNTERS),
+])
+def test_simulate_rejects_oversized_runs(quantidade, jogadores, encontros):
+    with pytest.raises(ValueError):
+        simulator.check_limits(quantidade, jogadores, encontros)
+    # recusado antes de alocar os arrays
+    with pytest.raises(ValueError):
+        simulator.simulate(_enc(quantidade, jogadores), encontros)
+
+
+def test_simulate_within_limits():
+    pytest.importorskip("numpy")
+    simulator.check_limits(10, 4, simulator.MAX_ENCOUNTERS)
+    res = simulator.simulate(_enc(3, 2), 200)
+    assert res["encontros"] == 200
+    assert abs(res["vitoria"] + res["derrota"] + res["empate"] - 1) < 1e-9
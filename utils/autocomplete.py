@@ -0,0 +1,132 @@
+# utils/autocomplete.py
+# Índices de busca para os autocompletes (monstros, ranks, itens, equipamentos, magias).
+# Cada índice é montado a partir de um Catalog e só é refeito quando o catálogo
+# recarrega (Catalog.version); a busca ignora acentos e maiúsculas.
+import bisect
+import unicodedata
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from discord import app_commands
+
+from utils import catalogs
+
+MAX_CHOICES = 25
+
+
+def normalize(text) -> str:
+    # "Lendário" -> "lendario"
+    text = unicodedata.normalize("NFKD", str(text))
+    return "".join(c for c in text if not unicodedata.combining(c)).casefold()
+
+
+def _label_nome(key: str, value) -> str:
+    nome = value.get("nome") if hasattr(value, "get") else None
+    return str(nome or key)
+
+
+class SearchIndex:
+    """
+    Prefixo: lista ordenada de (termo normalizado, posição) consultada com bisect,
+    onde os termos são a chave, o nome e cada palavra do nome.
+    Substring: varredura dos textos já normalizados, só para completar os 25.
+    """
+
+    def __init__(self, catalog: catalogs.Catalog, label: Callable[[str, object], str] = _label_nome):
+        self.catalog = catalog
+        self.label = label
+        self._version = None
+        self._entries: List[Tuple[str, str]] = []   # (label, key)
+        self._haystack: List[str] = []              # "chave label" normalizado
+        self._terms: List[Tuple[str, int]] = []
+
+    def _refresh(self):
+        data = self.catalog()
+        if self._version == self.catalog.version:
+            return
+        entries, haystack, terms = [], [], []
+        for i, key in enumerate(sorted(data.keys(), key=normalize)):
+            label = self.label(key, data[key])[:100]
+            entries.append((label, key))
+            norm_key, norm_label = normalize(key), normalize(label)
+            haystack.append(f"{norm_key} {norm_label}")
+            for term in {norm_key, norm_label, *norm_label.split(), *norm_key.replace("_", " ").split()}:
+                terms.append((term, i))
+        terms.sort()
+        self._entries, self._haystack, self._terms = entries, haystack, terms
+        self._version = self.catalog.version
+
+    def search(self, current: str, limit: int = MAX_CHOICES,
+               only: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
+        """Devolve até `limit` pares (label, key); prefixos primeiro, depois substrings."""
+        self._refresh()
+        q = normalize((current or "").strip())
+        allowed = set(only) if only is not None else None
+        seen, out = set(), []
+
+        def take(i: int) -> bool:
+            if i in seen:
+                return False
+            if allowed is not None and self._entries[i][1] not in allowed:
+                return False
+            seen.add(i)
+            out.append(self._entries[i])
+            return len(out) >= limit
+
+        if not q:
+            for i in range(len(self._entries)):
+                if take(i):
+                    return out
+            return out
+
+        pos = bisect.bisect_left(self._terms, (q, -1))
+        while pos < len(self._terms) and self._terms[pos][0].startswith(q):
+            if take(self._terms[pos][1]):
+                return out
+            pos += 1
+        for i, text in enumerate(self._haystack):
+            if q in text and take(i):
+                return out
+        return out
+
+    def choices(self, current: str, only: Optional[Iterable[str]] = None) -> List[app_commands.Choice[str]]:
+        return [app_commands.Choice(name=label, value=key) for label, key in self.search(current, only=only)]
+
+
+monsters_index = SearchIndex(catalogs.monsters, lambda k, v: _label_nome(k, v).capitalize())
+ranks_index = SearchIndex(catalogs.ranks, lambda k, v: k.capitalize())
+items_index = SearchIndex(catalogs.items)
+equip_index = SearchIndex(catalogs.equipamentos)
+magias_index = SearchIndex(catalogs.magias)
+
+
+# ============================================================
+# Callbacks prontos para @app_commands.autocomplete
+# ============================================================
+async def autocomplete_monstros(interaction, current: str):
+    return monsters_index.choices(current)
+
+
+async def autocomplete_ranks(interaction, current: str):
+    return ranks_index.choices(current)
+
+
+async def autocomplete_items(interaction, current: str):
+    return items_index.choices(current)
+
+
+async def autocomplete_inventario(interaction, current: str):
+    # só o que o jogador tem (para /vender)
+    from utils.storage import player_store
+    player = player_store.get(interaction.user.id) or {}
+    return items_index.choices(current, only=(player.get("inventory") or {}).keys())
+
+
+async def autocomplete_equipamentos(interaction, current: str):
+    return equip_index.choices(current)
+
+
+async def autocomplete_magias(interaction, current: str):
+    # só as magias que o jogador conhece (chaves de magic_xp)
+    from utils.storage import player_store
+    player = player_store.get(interaction.user.id) or {}
+    return magias_index.choices(current, only=(player.get("magic_xp") or {}).keys())
@@ -0,0 +1,91 @@
+# utils/catalogs.py
+# Catálogos estáticos (equipamentos, magias, itens, monstros, ranks) lidos uma vez
+# e recarregados só quando o arquivo muda no disco (mtime).
+import os
+from types import MappingProxyType
+from typing import Mapping, Any, Optional, Dict
+
+from utils.storage import load_json, save_json
+
+EQUIP_PATH = "./data/equipamentos.json"
+MAGIAS_PATH = "./data/magias.json"
+ITEMS_PATH = "./data/items.json"
+MONSTERS_PATH = "./data/monsters.json"
+RANKS_PATH = "./data/ranks.json"
+RANKS_PLAYER_PATH = "./data/ranks_player.json"
+GUILD_SETTINGS_PATH = "./data/guild_settings.json"
+
+
+# ============================================================
+# Estruturas imutáveis
+# ============================================================
+def freeze(obj):
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+def thaw(obj):
+    if isinstance(obj, Mapping):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [thaw(v) for v in obj]
+    return obj
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+# ============================================================
+# Catalog - um arquivo JSON em cache
+# ============================================================
+class Catalog:
+    """
+    Chamar o catálogo devolve o conteúdo congelado (MappingProxyType/tuple).
+    O arquivo só é relido quando o mtime muda; use load_mutable()/replace()
+    nos comandos de admin que editam o JSON.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data: Optional[Mapping[str, Any]] = None
+        self._mtime: Optional[int] = None
+        # incrementa a cada recarga; quem deriva índices do catálogo compara com isso
+        self.version = 0
+
+    def __call__(self) -> Mapping[str, Any]:
+        mtime = _mtime(self.path)
+        if self._data is None or mtime != self._mtime:
+            self._data = freeze(load_json(self.path, {}))
+            self._mtime = _mtime(self.path)
+            self.version += 1
+        return self._data
+
+    def get(self, key: str, default=None):
+        return self().get(key, default)
+
+    def load_mutable(self) -> Dict[str, Any]:
+        return thaw(self())
+
+    def replace(self, data: Dict[str, Any]):
+        # atualiza a memória na hora; o JsonWriter grava o arquivo depois
+        self._data = freeze(data)
+        self._mtime = _mtime(self.path)
+        self.version += 1
+        save_json(self.path, data)
+
+
+equipamentos = Catalog(EQUIP_PATH)
+magias = Catalog(MAGIAS_PATH)
+items = Catalog(ITEMS_PATH)
+monsters = Catalog(MONSTERS_PATH)
+ranks = Catalog(RANKS_PATH)
+ranks_player = Catalog(RANKS_PLAYER_PATH)
+# preferências por servidor ({guild_id: {...}}), editadas pelos comandos de admin
+guild_settings = Catalog(GUILD_SETTINGS_PATH)
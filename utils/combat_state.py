@@ -0,0 +1,260 @@
+# utils/combat_state.py
+# Estado dos combates ativos: active_combat[guild_id] -> Combat.
+# Cada monstro guarda só id e vida atual; nome, rank, CA, dano, imagem etc. ficam num
+# MonsterTemplate compartilhado por todos os monstros iguais (inclusive entre combates).
+#
+# Combates grandes (quantidade >= HORDE_MIN) usam uma Horde: a vida de todos os
+# monstros numa coluna array('i'), e contagem de vivos, dano em área e sorteio de
+# alvo viram operações vetorizadas (NumPy, quando instalado, sobre a mesma memória).
+import random
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+HORDE_MIN = 50
+
+np = None
+_np_checked = False
+
+
+def _numpy():
+    # NumPy é opcional e pesado para importar: só na primeira horda
+    global np, _np_checked
+    if not _np_checked:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            pass
+        _np_checked = True
+    return np
+
+
+# ============================================================
+# Monstros
+# ============================================================
+class MonsterTemplate:
+    __slots__ = ("nome", "rank", "nivel", "vida_max", "ca", "ki", "dano", "img", "bba")
+
+    def __init__(self, nome: str, rank: str, nivel: int, vida_max: int, ca: int, ki: int,
+                 dano: str, img: Optional[str], bba: int):
+        self.nome = nome
+        self.rank = rank
+        self.nivel = nivel
+        self.vida_max = vida_max
+        self.ca = ca
+        self.ki = ki
+        self.dano = dano
+        self.img = img
+        self.bba = bba
+
+
+_templates: Dict[Tuple, MonsterTemplate] = {}
+
+
+def monster_template(nome: str, rank: str, nivel, stats, img: Optional[str]) -> MonsterTemplate:
+    """Template para os stats de ranks.json (stats = ranks[rank][nivel]); iguais → mesmo objeto."""
+    values = (nome, rank, int(nivel), int(stats["vida"]), int(stats["ca"]), int(stats["ki"]),
+              stats["dano"], img, int(stats.get("bba", 0)))
+    tpl = _templates.get(values)
+    if tpl is None:
+        tpl = _templates[values] = MonsterTemplate(*values)
+    return tpl
+
+
+class MonsterInstance:
+    __slots__ = ("id", "vida_atual", "tpl")
+
+    def __init__(self, mid: int, tpl: MonsterTemplate, vida_atual: Optional[int] = None):
+        self.id = mid
+        self.tpl = tpl
+        self.vida_atual = tpl.vida_max if vida_atual is None else vida_atual
+
+    nome = property(lambda self: self.tpl.nome)
+    rank = property(lambda self: self.tpl.rank)
+    nivel = property(lambda self: self.tpl.nivel)
+    vida_max = property(lambda self: self.tpl.vida_max)
+    ca = property(lambda self: self.tpl.ca)
+    ki = property(lambda self: self.tpl.ki)
+    dano = property(lambda self: self.tpl.dano)
+    img = property(lambda self: self.tpl.img)
+    bba = property(lambda self: self.tpl.bba)
+
+    @property
+    def vivo(self) -> bool:
+        return self.vida_atual > 0
+
+    def get(self, field: str, default=None):
+        # leitura por nome de campo, para quem trata monstros como "monster_data"
+        # (cards do grid, tabelas de loot)
+        return getattr(self, field, default)
+
+
+# ============================================================
+# Coleções de monstros (combate.monsters)
+# ============================================================
+class MonsterDict(dict):
+    """id -> MonsterInstance, para combates pequenos."""
+
+    def alive_ids(self) -> List[int]:
+        return [mid for mid, m in self.items() if m.vida_atual > 0]
+
+    def dead_ids(self) -> List[int]:
+        return [mid for mid, m in self.items() if m.vida_atual <= 0]
+
+    def alive_count(self) -> int:
+        return sum(1 for m in self.values() if m.vida_atual > 0)
+
+    def random_alive(self) -> Optional[int]:
+        alive = self.alive_ids()
+        return random.choice(alive) if alive else None
+
+    def damage(self, mid: int, dano: int):
+        m = self.get(mid)
+        if m is not None:
+            m.vida_atual = max(0, m.vida_atual - int(dano))
+
+    def damage_many(self, ids: Iterable[int], danos: Iterable[int]):
+        for mid, dano in zip(ids, danos):
+            self.damage(mid, dano)
+
+
+class HordeMember(MonsterInstance):
+    """Visão de um monstro da horda: a vida fica na coluna da Horde."""
+
+    __slots__ = ("horde",)
+
+    def __init__(self, horde: "Horde", mid: int):
+        self.horde = horde
+        self.id = mid
+        self.tpl = horde.tpl
+
+    @property
+    def vida_atual(self) -> int:
+        return self.horde.hp[self.id - 1]
+
+    @vida_atual.setter
+    def vida_atual(self, value: int):
+        self.horde.hp[self.id - 1] = value
+
+
+class Horde(Mapping):
+    """
+    id -> monstro para combates grandes de um único tipo: ids 1..n, um template
+    e a vida numa coluna. Os monstros lidos por id são visões criadas na hora.
+    """
+
+    def __init__(self, tpl: MonsterTemplate, quantidade: int):
+        self.tpl = tpl
+        self.hp = array("i", [tpl.vida_max]) * quantidade
+        numpy = _numpy()
+        # mesma memória do array: escrever em um atualiza o outro
+        self._np = numpy.frombuffer(self.hp, dtype=numpy.intc) if numpy is not None else None
+
+    def __len__(self) -> int:
+        return len(self.hp)
+
+    def __iter__(self):
+        return iter(range(1, len(self.hp) + 1))
+
+    def __contains__(self, mid) -> bool:
+        return isinstance(mid, int) and 1 <= mid <= len(self.hp)
+
+    def __getitem__(self, mid) -> HordeMember:
+        if mid not in self:
+            raise KeyError(mid)
+        return HordeMember(self, mid)
+
+    def alive_ids(self) -> List[int]:
+        if self._np is not None:
+            return (np.flatnonzero(self._np > 0) + 1).tolist()
+        return [i + 1 for i, hp in enumerate(self.hp) if hp > 0]
+
+    def dead_ids(self) -> List[int]:
+        if self._np is not None:
+            return (np.flatnonzero(self._np <= 0) + 1).tolist()
+        return [i + 1 for i, hp in enumerate(self.hp) if hp <= 0]
+
+    def alive_count(self) -> int:
+        if self._np is not None:
+            return int(np.count_nonzero(self._np > 0))
+        return sum(1 for hp in self.hp if hp > 0)
+
+    def random_alive(self) -> Optional[int]:
+        alive = self.alive_ids()
+        return random.choice(alive) if alive else None
+
+    def damage(self, mid: int, dano: int):
+        if mid in self:
+            self.hp[mid - 1] = max(0, self.hp[mid - 1] - int(dano))
+
+    def damage_many(self, ids: Iterable[int], danos: Iterable[int]):
+        # ids sem repetição (ex.: alive_ids() no dano em área)
+        if self._np is None:
+            for mid, dano in zip(ids, danos):
+                self.damage(mid, dano)
+            return
+        idx = np.asarray(list(ids), dtype=np.int64) - 1
+        if idx.size:
+            self._np[idx] = np.maximum(0, self._np[idx] - np.asarray(danos, dtype=np.int64)[:idx.size])
+
+
+# ============================================================
+# Ordem de turnos
+# ============================================================
+class TurnEntry:
+    __slots__ = ("type", "id", "initiative")
+
+    def __init__(self, type: str, id, initiative: int):
+        self.type = type
+        self.id = id
+        self.initiative = initiative
+
+
+# ============================================================
+# Combate
+# ============================================================
+class Combat:
+    __slots__ = (
+        "channel_id", "channel_base_name", "main_message_id",
+        "monsters", "players",
+        # combate por turnos
+        "turn_order", "current_index", "round", "status",
+        # mensagem de status (render_main_status)
+        "status_msg", "status_page", "status_paged", "status_grid_sig", "status_grid_file",
+        "status_embed_hash",
+        # renomear o canal (_rename_channel)
+        "channel_alive", "channel_named_alive", "channel_renames", "channel_rename_timer",
+    )
+
+    def __init__(self, channel_id: int, channel_base_name: str, status: Optional[str] = None):
+        self.channel_id = channel_id
+        self.channel_base_name = channel_base_name
+        self.main_message_id: Optional[int] = None
+        self.monsters: Mapping[int, MonsterInstance] = MonsterDict()
+        self.players: Dict[str, Dict[str, Any]] = {}
+        self.turn_order: List[TurnEntry] = []
+        self.current_index = 0
+        self.round = 0
+        self.status = status
+        self.status_msg = None
+        self.status_page = 0
+        self.status_paged = False
+        self.status_grid_sig = None
+        self.status_grid_file: Optional[str] = None
+        self.status_embed_hash: Optional[str] = None
+        self.channel_alive = 0
+        self.channel_named_alive: Optional[int] = None
+        self.channel_renames: List[float] = []
+        self.channel_rename_timer = None
+
+    def spawn(self, tpl: MonsterTemplate, quantidade: int):
+        # ids 1..quantidade, todos apontando para o mesmo template
+        if quantidade >= HORDE_MIN:
+            self.monsters = Horde(tpl, quantidade)
+            return
+        for i in range(1, quantidade + 1):
+            self.monsters[i] = MonsterInstance(i, tpl)
+
+    def alive_count(self) -> int:
+        return self.monsters.alive_count()
@@ -1,14 +1,427 @@
+# utils/dice.py
+# Motor único de dados: a expressão é compilada uma vez num RollPlan
+# (cache LRU por string) e cada rolagem só executa o plano.
+#
+# Sintaxe: termos somados/subtraídos, ex. "2d8+1d6+3", "1d20-2", "4d6kh3",
+# "2d20kl1", "4d6dl1", "1d6!" (explode no valor máximo), "5".
+import math
 import random
 import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
-def roll_damage(dice_expression: str) -> int:
-    match = re.match(r"(\d+)d(\d+)\+?(\d+)?", dice_expression)
-    if not match:
+# NumPy é opcional (sem ele, roll_batch cai para um loop em Python) e só é
+# importado na primeira rolagem em lote / distribuição
+np = None
+_rng = None
+_np_checked = False
+
+
+def _numpy():
+    global np, _rng, _np_checked
+    if not _np_checked:
+        try:
+            import numpy
+            _rng = numpy.random.default_rng()
+            np = numpy
+        except ImportError:
+            pass
+        _np_checked = True
+    return np
+
+MAX_DICE = 1000
+MAX_FACES = 10000
+# limite de re-rolagens de um dado explosivo
+MAX_EXPLODE = 100
+# tamanho máximo do suporte (max - min) para o cálculo exato de distribuição
+MAX_DIST_SPAN = 200000
+# orçamento de trabalho do cálculo exato (ver distribution_cost; ~0,5 s)
+MAX_DIST_WORK = 5_000_000
+# quantas vezes a convolução do NumPy é mais rápida que o laço Python
+NUMPY_CONV_SPEEDUP = 200
+# amostras da estimativa quando o cálculo exato sai caro demais
+DIST_SAMPLES = 20000
+# probabilidade abaixo da qual a cauda de um dado explosivo é cortada
+EXPLODE_TAIL = 1e-12
+
+_TERM_RE = re.compile(
+    r"([+\-])?(?:(\d*)d(\d+)(!)?(?:(kh|kl|dh|dl|k)(\d+))?|(\d+))",
+    re.IGNORECASE
+)
+
+
+class DiceTerm:
+    __slots__ = ("sign", "count", "faces", "explode", "keep", "keep_n")
+
+    def __init__(self, sign: int, count: int, faces: int, explode: bool = False,
+                 keep: Optional[str] = None, keep_n: int = 0):
+        self.sign = sign
+        self.count = count
+        self.faces = faces
+        self.explode = explode
+        # "kh"/"kl" mantém os N maiores/menores; "dh"/"dl" descarta
+        self.keep = keep
+        self.keep_n = keep_n
+
+    def _roll_one(self) -> int:
+        value = random.randint(1, self.faces)
+        if self.explode:
+            total = value
+            n = 0
+            while value == self.faces and n < MAX_EXPLODE:
+                value = random.randint(1, self.faces)
+                total += value
+                n += 1
+            return total
+        return value
+
+    def roll(self) -> List[int]:
+        if not self.explode and self.count > 1:
+            values = random.choices(range(1, self.faces + 1), k=self.count)
+        else:
+            values = [self._roll_one() for _ in range(self.count)]
+        if self.keep:
+            ordered = sorted(values, reverse=True)
+            if self.keep == "kh":
+                values = ordered[:self.keep_n]
+            elif self.keep == "kl":
+                values = ordered[len(ordered) - self.keep_n:]
+            elif self.keep == "dh":
+                values = ordered[self.keep_n:]
+            else:
+                values = ordered[:len(ordered) - self.keep_n]
+        return values
+
+    def roll_batch(self, n: int):
+        # uma matriz (n, count) de uma vez em vez de n*count chamadas a randint
+        rolls = _rng.integers(1, self.faces + 1, size=(n, self.count))
+        if self.explode:
+            hit = rolls == self.faces
+            k = 0
+            while k < MAX_EXPLODE and hit.any():
+                extra = _rng.integers(1, self.faces + 1, size=int(hit.sum()))
+                rolls[hit] += extra
+                again = np.zeros_like(hit)
+                again[hit] = extra == self.faces
+                hit = again
+                k += 1
+        if self.keep:
+            rolls.sort(axis=1)
+            if self.keep == "kh":
+                rolls = rolls[:, self.count - self.keep_n:]
+            elif self.keep == "kl":
+                rolls = rolls[:, :self.keep_n]
+            elif self.keep == "dh":
+                rolls = rolls[:, :self.count - self.keep_n]
+            else:
+                rolls = rolls[:, self.keep_n:]
+        return rolls.sum(axis=1)
+
+
+class RollPlan:
+    """Expressão de dados já compilada. Use compile_dice() para obter uma."""
+
+    __slots__ = ("expression", "terms", "modifier")
+
+    def __init__(self, expression: str, terms: Tuple[DiceTerm, ...], modifier: int):
+        self.expression = expression
+        self.terms = terms
+        self.modifier = modifier
+
+    def roll_dice(self) -> List[int]:
+        # valores dos dados mantidos (negativos nos termos subtraídos), sem o modificador
+        out = []
+        for t in self.terms:
+            if t.sign > 0:
+                out.extend(t.roll())
+            else:
+                out.extend(-v for v in t.roll())
+        return out
+
+    def roll(self) -> int:
+        total = self.modifier
+        for t in self.terms:
+            if t.count == 1 and not t.explode and not t.keep:
+                total += t.sign * random.randint(1, t.faces)
+            else:
+                total += t.sign * sum(t.roll())
+        return total
+
+    def roll_batch(self, n: int):
+        """
+        Rola a expressão n vezes. Com NumPy devolve um ndarray de inteiros
+        (um termo = uma matriz amostrada de uma vez); sem NumPy, uma lista.
+        """
+        if _numpy() is None:
+            return [self.roll() for _ in range(n)]
+        total = np.full(n, self.modifier, dtype=np.int64)
+        for t in self.terms:
+            total += t.sign * t.roll_batch(n)
+        return total
+
+    @property
+    def is_d20(self) -> bool:
+        # 1d20 puro (com ou sem modificador): vale crítico/falha natural
+        return len(self.terms) == 1 and self.terms[0].count == 1 and self.terms[0].faces == 20 \
+            and not self.terms[0].keep and not self.terms[0].explode
+
+
+@lru_cache(maxsize=1024)
+def compile_dice(expression: str) -> RollPlan:
+    """Compila "2d8+1d6+3" num RollPlan. Levanta ValueError se a expressão for inválida."""
+    s = (expression or "").replace(" ", "").lower()
+    if not s:
+        raise ValueError("Expressão de dados vazia.")
+    terms = []
+    modifier = 0
+    pos = 0
+    while pos < len(s):
+        m = _TERM_RE.match(s, pos)
+        if not m or m.end() == pos or (pos > 0 and not m.group(1)):
+            raise ValueError(f"Expressão de dados inválida: {expression}")
+        sign = -1 if m.group(1) == "-" else 1
+        if m.group(7) is not None:
+            modifier += sign * int(m.group(7))
+        else:
+            count = int(m.group(2) or 1)
+            faces = int(m.group(3))
+            if count < 1 or faces < 1 or count > MAX_DICE or faces > MAX_FACES:
+                raise ValueError(f"Quantidade/faces fora do limite: {expression}")
+            keep = m.group(5)
+            keep_n = int(m.group(6) or 0)
+            if keep == "k":
+                keep = "kh"
+            if keep in ("kh", "kl") and not (1 <= keep_n <= count):
+                raise ValueError(f"Mantém mais dados do que rolou: {expression}")
+            if keep in ("dh", "dl") and not (0 <= keep_n < count):
+                raise ValueError(f"Descarta todos os dados rolados: {expression}")
+            explode = bool(m.group(4)) and faces > 1
+            terms.append(DiceTerm(sign, count, faces, explode, keep, keep_n))
+        pos = m.end()
+    return RollPlan(expression, tuple(terms), modifier)
+
+
+def roll_dice(formula) -> int:
+    """Rola uma fórmula ("2d12+15", "1d4", "3"). Fórmula vazia ou inválida rola 0."""
+    if formula is None:
         return 0
+    try:
+        return compile_dice(str(formula)).roll()
+    except ValueError:
+        return 0
+
+
+def roll_batch(formula: str, n: int):
+    """Rola a mesma fórmula n vezes (ex.: dano em área contra todos os monstros)."""
+    return compile_dice(str(formula)).roll_batch(n)
+
+
+def roll_damage(dice_expression: str) -> int:
+    return roll_dice(dice_expression)
+
+
+# =====================================================
+# Distribuição exata (convolução das PMFs de cada dado)
+# =====================================================
+def _convolve(a: List[float], b: List[float]) -> List[float]:
+    if _numpy() is not None:
+        return np.convolve(a, b).tolist()
+    out = [0.0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x == 0.0:
+            continue
+        for j, y in enumerate(b):
+            out[i + j] += x * y
+    return out
+
+
+def _power(pmf: List[float], n: int) -> List[float]:
+    # n convoluções por quadrados sucessivos
+    result = [1.0]
+    base = pmf
+    while n:
+        if n & 1:
+            result = _convolve(result, base)
+        n >>= 1
+        if n:
+            base = _convolve(base, base)
+    return result
+
+
+def _exploding_die(faces: int) -> List[float]:
+    # P(faces*k + r) = (1/faces)^(k+1), r em 1..faces-1; a cauda desprezível é cortada
+    p = 1.0 / faces
+    pmf = []
+    weight = p
+    for _ in range(MAX_EXPLODE + 1):
+        pmf.extend([weight] * (faces - 1))
+        pmf.append(0.0)
+        weight *= p
+        if weight < EXPLODE_TAIL:
+            break
+    pmf[-1] = weight * faces
+    return pmf
+
+
+def _keep_pmf(count: int, faces: int, keep_high: bool, kept: int) -> Dict[int, float]:
+    # soma dos `kept` maiores (ou menores) dados: distribui quantos dados caem em
+    # cada face, da mais alta para a mais baixa (ou o contrário), com peso multinomial
+    p = 1.0 / faces
+    order = range(faces, 0, -1) if keep_high else range(1, faces + 1)
+    last = 1 if keep_high else faces
+    dp = {0: {0: 1.0}}
+    for v in order:
+        new: Dict[int, Dict[int, float]] = {}
+        for placed, sums in dp.items():
+            rem = count - placed
+            for c in range(rem + 1):
+                if v == last and c != rem:
+                    continue
+                w = math.comb(rem, c) * p ** c
+                add = min(c, max(0, kept - placed)) * v
+                bucket = new.setdefault(placed + c, {})
+                for total, pr in sums.items():
+                    bucket[total + add] = bucket.get(total + add, 0.0) + pr * w
+        dp = new
+    return dp[count]
+
+
+def _term_pmf(t: DiceTerm) -> Tuple[int, List[float]]:
+    if t.keep:
+        if t.explode:
+            raise ValueError("Estatística exata não suporta dados explosivos com keep/drop.")
+        keep_high = t.keep in ("kh", "dl")
+        kept = t.keep_n if t.keep in ("kh", "kl") else t.count - t.keep_n
+        sums = _keep_pmf(t.count, t.faces, keep_high, kept)
+        lo = min(sums)
+        pmf = [0.0] * (max(sums) - lo + 1)
+        for total, pr in sums.items():
+            pmf[total - lo] = pr
+        return lo, pmf
+    die = _exploding_die(t.faces) if t.explode else [1.0 / t.faces] * t.faces
+    return t.count, _power(die, t.count)
+
+
+class Distribution:
+    """PMF exata de uma expressão: pmf[i] = P(total == offset + i)."""
+
+    __slots__ = ("offset", "pmf", "_cdf")
+
+    def __init__(self, offset: int, pmf: List[float]):
+        self.offset = offset
+        self.pmf = pmf
+        acc = 0.0
+        self._cdf = []
+        for x in pmf:
+            acc += x
+            self._cdf.append(acc)
+
+    @property
+    def min(self) -> int:
+        return self.offset
+
+    @property
+    def max(self) -> int:
+        return self.offset + len(self.pmf) - 1
+
+    @property
+    def mean(self) -> float:
+        return sum((self.offset + i) * p for i, p in enumerate(self.pmf))
+
+    @property
+    def variance(self) -> float:
+        mu = self.mean
+        return sum((self.offset + i - mu) ** 2 * p for i, p in enumerate(self.pmf))
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def percentile(self, q: float) -> int:
+        # menor valor com P(total <= valor) >= q (q entre 0 e 100)
+        target = q / 100.0 * self._cdf[-1] - 1e-12
+        for i, acc in enumerate(self._cdf):
+            if acc >= target:
+                return self.offset + i
+        return self.max
+
+    def prob_at_least(self, x: int) -> float:
+        i = int(x) - self.offset
+        if i <= 0:
+            return 1.0
+        if i >= len(self.pmf):
+            return 0.0
+        return max(0.0, 1.0 - self._cdf[i - 1])
+
+
+def _power_cost(size: int, n: int) -> int:
+    # multiplicações feitas por _power (quadrados sucessivos) sobre uma PMF de `size` pontos
+    cost, result, base = 0, 1, size
+    while n:
+        if n & 1:
+            cost += result * base
+            result += base - 1
+        n >>= 1
+        if n:
+            cost += base * base
+            base = 2 * base - 1
+    return cost
+
+
+def distribution_cost(plan: RollPlan) -> int:
+    """
+    Estimativa do trabalho do cálculo exato, em operações do laço Python.
+    keep/drop: faces * count² * (valores possíveis da soma); convolução: tamanho a × tamanho b
+    (dividido por NUMPY_CONV_SPEEDUP quando o NumPy faz a convolução).
+    """
+    python_ops, conv_ops, size = 0, 0, 1
+    for t in plan.terms:
+        if t.keep:
+            kept = t.keep_n if t.keep in ("kh", "kl") else t.count - t.keep_n
+            python_ops += t.faces * t.count * t.count // 2 * (max(0, kept) * t.faces + 1)
+            term_size = max(0, kept) * (t.faces - 1) + 1
+        else:
+            die = len(_exploding_die(t.faces)) if t.explode else t.faces
+            conv_ops += _power_cost(die, t.count)
+            term_size = t.count * (die - 1) + 1
+        conv_ops += size * term_size
+        size += term_size - 1
+    if _numpy() is not None:
+        conv_ops //= NUMPY_CONV_SPEEDUP
+    return python_ops + conv_ops
+
+
+def exact_distribution_ok(plan: RollPlan) -> bool:
+    """True se o cálculo exato cabe nos limites de tamanho e de trabalho."""
+    span = sum(t.count * t.faces * (2 if t.explode else 1) for t in plan.terms)
+    return span <= MAX_DIST_SPAN and distribution_cost(plan) <= MAX_DIST_WORK
+
+
+@lru_cache(maxsize=256)
+def _plan_distribution(plan: RollPlan) -> Distribution:
+    if not exact_distribution_ok(plan):
+        raise ValueError("Expressão grande demais para o cálculo exato.")
+    offset = plan.modifier
+    pmf = [1.0]
+    for t in plan.terms:
+        lo, term = _term_pmf(t)
+        if t.sign < 0:
+            lo, term = -(lo + len(term) - 1), term[::-1]
+        offset += lo
+        pmf = _convolve(pmf, term)
+    return Distribution(offset, pmf)
+
+
+def distribution(expression: str) -> Distribution:
+    """Distribuição exata de uma expressão (cache por expressão compilada)."""
+    return _plan_distribution(compile_dice(expression))
 
-    num, sides, extra = match.groups()
-    num = int(num)
-    sides = int(sides)
-    extra = int(extra) if extra else 0
 
-    return sum(random.randint(1, sides) for _ in range(num)) + extra
+def estimate_distribution(expression: str, samples: int = DIST_SAMPLES) -> Distribution:
+    """Distribuição empírica de `samples` rolagens em lote (para expressões caras demais)."""
+    if _numpy() is None:
+        raise ValueError("Expressão grande demais para o cálculo exato (a estimativa precisa do NumPy).")
+    totals = np.asarray(compile_dice(expression).roll_batch(samples))
+    lo = int(totals.min())
+    counts = np.bincount(totals - lo)
+    return Distribution(lo, (counts / samples).tolist())
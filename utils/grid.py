@@ -1,7 +1,18 @@
-from PIL import Image, ImageDraw, ImageFont
-import aiohttp
+from __future__ import annotations
+
+import asyncio
+import hashlib
 import io
 import math
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import aiohttp
 
 # Configurações de layout do card
 CARD_WIDTH = 360
@@ -11,22 +22,169 @@ IMG_SIZE = 120  # imagem à esquerda (largura e altura)
 TEXT_AREA_X = PADDING + IMG_SIZE + 10
 TEXT_AREA_WIDTH = CARD_WIDTH - TEXT_AREA_X - PADDING
 
-# Fonte: usar a fonte padrão do PIL (carrega bitmap básico)
-try:
-    DEFAULT_FONT = ImageFont.truetype("arial.ttf", 16)
-    SMALL_FONT = ImageFont.truetype("arial.ttf", 14)
-except:
-    DEFAULT_FONT = ImageFont.load_default()
-    SMALL_FONT = ImageFont.load_default()
+# Pillow e aiohttp só são importados no primeiro uso (o bot sobe mais rápido)
+Image = ImageDraw = ImageFont = None
+DEFAULT_FONT = SMALL_FONT = None
+
+
+def _pil():
+    global Image, ImageDraw, ImageFont, DEFAULT_FONT, SMALL_FONT
+    if Image is None:
+        from PIL import Image as _Image, ImageDraw as _ImageDraw, ImageFont as _ImageFont
+        # Fonte: usar a fonte padrão do PIL (carrega bitmap básico)
+        try:
+            DEFAULT_FONT = _ImageFont.truetype("arial.ttf", 16)
+            SMALL_FONT = _ImageFont.truetype("arial.ttf", 14)
+        except:
+            DEFAULT_FONT = _ImageFont.load_default()
+            SMALL_FONT = _ImageFont.load_default()
+        ImageDraw, ImageFont = _ImageDraw, _ImageFont
+        # por último: outra thread só usa o Pillow depois que tudo acima está pronto
+        Image = _Image
+    return Image
+
+
+# Download das imagens: uma sessão por bot (pool de conexões), limite por host
+FETCH_TIMEOUT = 10  # segundos por imagem
+MAX_CONNECTIONS = 20
+MAX_PER_HOST = 4
+
+_session: Optional[aiohttp.ClientSession] = None
+# downloads em andamento por URL: quem pedir a mesma imagem espera o mesmo download
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def get_session() -> aiohttp.ClientSession:
+    # criada no primeiro uso, dentro do loop do bot
+    global _session
+    if _session is None or _session.closed:
+        import aiohttp
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=MAX_CONNECTIONS, limit_per_host=MAX_PER_HOST),
+            timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT)
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+# ============================================================
+# Cache de miniaturas: LRU em memória + arquivos em data/img_cache
+# ============================================================
+IMG_CACHE_DIR = "./data/img_cache"
+IMG_CACHE_SIZE = 256  # miniaturas mantidas em memória
+
+
+def make_thumbnail(data: bytes) -> Image.Image:
+    _pil()
+    img = Image.open(io.BytesIO(data)).convert("RGBA")
+    img.thumbnail((IMG_SIZE, IMG_SIZE))
+    return img
+
+
+class ThumbCache:
+    """
+    Guarda as imagens já reduzidas para IMG_SIZE (RGBA). A memória é um LRU limitado;
+    o disco guarda um PNG por URL (nome = sha256 da URL) e sobrevive a reinícios.
+    """
+
+    def __init__(self, directory: str = IMG_CACHE_DIR, size: int = IMG_CACHE_SIZE):
+        self.directory = directory
+        self.size = size
+        self._mem: "OrderedDict[str, Image.Image]" = OrderedDict()
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode("utf8")).hexdigest() + ".png")
+
+    def get(self, url: str) -> Optional[Image.Image]:
+        img = self._mem.get(url)
+        if img is not None:
+            self._mem.move_to_end(url)
+        return img
+
+    def remember(self, url: str, img: Image.Image):
+        self._mem[url] = img
+        self._mem.move_to_end(url)
+        while len(self._mem) > self.size:
+            self._mem.popitem(last=False)
+
+    def load_disk(self, url: str) -> Optional[Image.Image]:
+        if not os.path.exists(self._path(url)):
+            return None
+        _pil()
+        try:
+            with Image.open(self._path(url)) as f:
+                return f.convert("RGBA")
+        except (OSError, ValueError):
+            return None
+
+    def store_disk(self, url: str, img: Image.Image):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".png", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                img.save(f, format="PNG")
+            os.replace(tmp, self._path(url))
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
 
 
-async def fetch_image(session, url):
+thumb_cache = ThumbCache()
+
+
+def _decode_and_store(url: str, data: bytes) -> Optional[Image.Image]:
+    try:
+        img = make_thumbnail(data)
+    except Exception:
+        return None
+    thumb_cache.store_disk(url, img)
+    return img
+
+
+async def _download(url: str):
     try:
-        async with session.get(url) as resp:
-            data = await resp.read()
-            return Image.open(io.BytesIO(data)).convert("RGBA")
-    except:
+        img = await asyncio.to_thread(thumb_cache.load_disk, url)
+        if img is None:
+            async with get_session().get(url) as resp:
+                if resp.status != 200:
+                    return None
+                data = await resp.read()
+            img = await asyncio.to_thread(_decode_and_store, url, data)
+        if img is not None:
+            thumb_cache.remember(url, img)
+        return img
+    except Exception:
         return None
+    finally:
+        _inflight.pop(url, None)
+
+
+async def fetch_image(url: str):
+    """Miniatura (IMG_SIZE, RGBA) da URL: memória → disco → download."""
+    img = thumb_cache.get(url)
+    if img is not None:
+        return img
+    task = _inflight.get(url)
+    if task is None:
+        task = asyncio.ensure_future(_download(url))
+        _inflight[url] = task
+    # shield: cancelar quem espera não cancela o download dos outros
+    return await asyncio.shield(task)
+
+
+async def fetch_images(urls) -> Dict[str, Optional[Image.Image]]:
+    """Baixa cada URL distinta uma única vez, todas em paralelo."""
+    unique = list(dict.fromkeys(u for u in urls if u))
+    results = await asyncio.gather(*(fetch_image(u) for u in unique))
+    return dict(zip(unique, results))
 
 
 def draw_hp_bar(draw: ImageDraw.Draw, x, y, width, height, current, maximum):
@@ -44,78 +202,160 @@ def draw_hp_bar(draw: ImageDraw.Draw, x, y, width, height, current, maximum):
     draw.rectangle([x, y, x + width, y + height], outline=(0, 0, 0))
 
 
-async def gerar_grid(inimigos: dict, colunas: int = 3):
-    """
-    inimigos: dict { id: monster_data, ... }
-    Retorna BytesIO de PNG com grid estilo card (imagem à esquerda, texto à direita)
-    """
-    # coletar monstros (pular GRID_MSG se existir)
-    mobs = []
-    for k, v in inimigos.items():
-        if k == "GRID_MSG":
-            continue
-        mobs.append(v)
+# ============================================================
+# Cards: cada card renderizado fica em cache pelo que ele mostra
+# ============================================================
+CARD_CACHE_SIZE = 512
+CARD_FIELDS = ("id", "nome", "vida_atual", "vida_max", "ca", "ki", "bba", "img")
+
+_card_cache: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+# renders de guilds diferentes podem rodar ao mesmo tempo no pool de threads
+_card_lock = threading.Lock()
+
+
+def card_key(mob: dict, has_img: bool) -> tuple:
+    # has_img: um card desenhado sem a imagem (download falhou) não pode ser reaproveitado depois
+    return tuple(mob.get(f) for f in CARD_FIELDS) + (has_img,)
 
-    if not mobs:
-        return None
 
-    # baixar imagens em paralelo
-    async with aiohttp.ClientSession() as session:
-        images = []
-        for mob in mobs:
-            img = None
-            if mob.get("img"):
-                img = await fetch_image(session, mob["img"])
-            images.append(img)
-
-    # criar cards
-    cards = []
-    for mob, img in zip(mobs, images):
-        card = Image.new("RGBA", (CARD_WIDTH, CARD_HEIGHT), (240, 240, 240, 255))
-        draw = ImageDraw.Draw(card)
-
-        # borda externa
-        draw.rectangle([0, 0, CARD_WIDTH - 1, CARD_HEIGHT - 1], outline=(40, 40, 40), width=2)
-
-        # imagem do lado esquerdo
-        if img:
-            img = img.copy()
-            img.thumbnail((IMG_SIZE, IMG_SIZE))
-            # centralizar verticalmente na área da imagem
-            img_x = PADDING
-            img_y = PADDING + (CARD_HEIGHT - 2 * PADDING - IMG_SIZE) // 2
-            card.paste(img, (img_x, img_y), img)
+def render_card(mob: dict, img: Optional[Image.Image]) -> Image.Image:
+    card = Image.new("RGBA", (CARD_WIDTH, CARD_HEIGHT), (240, 240, 240, 255))
+    draw = ImageDraw.Draw(card)
+
+    # borda externa
+    draw.rectangle([0, 0, CARD_WIDTH - 1, CARD_HEIGHT - 1], outline=(40, 40, 40), width=2)
+
+    # imagem do lado esquerdo
+    if img:
+        # já vem reduzida do cache de miniaturas
+        # centralizar verticalmente na área da imagem
+        img_x = PADDING
+        img_y = PADDING + (CARD_HEIGHT - 2 * PADDING - IMG_SIZE) // 2
+        card.paste(img, (img_x, img_y), img)
+    else:
+        # retângulo vazio se sem imagem
+        img_x = PADDING
+        img_y = PADDING + (CARD_HEIGHT - 2 * PADDING - IMG_SIZE) // 2
+        draw.rectangle([img_x, img_y, img_x + IMG_SIZE, img_y + IMG_SIZE], fill=(180, 180, 180))
+
+    # Texto: nome
+    name_text = f"{mob.get('nome', 'Monstro')} #{mob.get('id')}"
+    draw.text((TEXT_AREA_X, PADDING), name_text, font=DEFAULT_FONT, fill=(10, 10, 10))
+
+    # HP bar and text
+    hp_y = PADDING + 28
+    bar_x = TEXT_AREA_X
+    bar_w = TEXT_AREA_WIDTH - 10
+    bar_h = 14
+    draw_hp_bar(draw, bar_x, hp_y, bar_w, bar_h, mob.get("vida_atual", 0), mob.get("vida_max", 1))
+    hp_text = f"HP: {mob.get('vida_atual',0)}/{mob.get('vida_max',0)}"
+    draw.text((TEXT_AREA_X, hp_y + bar_h + 4), hp_text, font=SMALL_FONT, fill=(20,20,20))
+
+    # CA, KI and BBA
+    info_y = hp_y + bar_h + 26
+    ca_text = f"CA: {mob.get('ca', 0)}"
+    ki_text = f"KI: {mob.get('ki', 0)}"
+    bba_val = mob.get("bba", 0)
+    bba_text = f"BBA: {'+' if bba_val >= 0 else ''}{bba_val}"
+
+    draw.text((TEXT_AREA_X, info_y), ca_text, font=SMALL_FONT, fill=(10,10,10))
+    draw.text((TEXT_AREA_X + 110, info_y), ki_text, font=SMALL_FONT, fill=(10,10,10))
+    draw.text((TEXT_AREA_X, info_y + 18), bba_text, font=SMALL_FONT, fill=(10,10,10))
+
+    return card
+
+
+def get_card(mob: dict, img: Optional[Image.Image]) -> Image.Image:
+    """Card do monstro; só redesenha se algum campo exibido mudou."""
+    key = card_key(mob, img is not None)
+    with _card_lock:
+        card = _card_cache.get(key)
+        if card is not None:
+            _card_cache.move_to_end(key)
+            return card
+    card = render_card(mob, img)
+    with _card_lock:
+        _card_cache[key] = card
+        while len(_card_cache) > CARD_CACHE_SIZE:
+            _card_cache.popitem(last=False)
+    return card
+
+
+# ============================================================
+# Executor: o Pillow roda fora do loop (GRID_EXECUTOR=thread|process, GRID_WORKERS=N)
+# ============================================================
+GRID_WORKERS = 2
+
+_executor: Optional[Executor] = None
+_use_processes = False
+
+
+def get_executor() -> Executor:
+    # lido só no primeiro render, depois que o main.py carregou o .env
+    global _executor, _use_processes
+    if _executor is None:
+        workers = int(os.getenv("GRID_WORKERS", GRID_WORKERS))
+        _use_processes = os.getenv("GRID_EXECUTOR", "thread").lower() == "process"
+        if _use_processes:
+            _executor = ProcessPoolExecutor(max_workers=workers)
         else:
-            # retângulo vazio se sem imagem
-            img_x = PADDING
-            img_y = PADDING + (CARD_HEIGHT - 2 * PADDING - IMG_SIZE) // 2
-            draw.rectangle([img_x, img_y, img_x + IMG_SIZE, img_y + IMG_SIZE], fill=(180, 180, 180))
-
-        # Texto: nome
-        name_text = f"{mob.get('nome', 'Monstro')} #{mob.get('id')}"
-        draw.text((TEXT_AREA_X, PADDING), name_text, font=DEFAULT_FONT, fill=(10, 10, 10))
-
-        # HP bar and text
-        hp_y = PADDING + 28
-        bar_x = TEXT_AREA_X
-        bar_w = TEXT_AREA_WIDTH - 10
-        bar_h = 14
-        draw_hp_bar(draw, bar_x, hp_y, bar_w, bar_h, mob.get("vida_atual", 0), mob.get("vida_max", 1))
-        hp_text = f"HP: {mob.get('vida_atual',0)}/{mob.get('vida_max',0)}"
-        draw.text((TEXT_AREA_X, hp_y + bar_h + 4), hp_text, font=SMALL_FONT, fill=(20,20,20))
-
-        # CA, KI and BBA
-        info_y = hp_y + bar_h + 26
-        ca_text = f"CA: {mob.get('ca', 0)}"
-        ki_text = f"KI: {mob.get('ki', 0)}"
-        bba_val = mob.get("bba", 0)
-        bba_text = f"BBA: {'+' if bba_val >= 0 else ''}{bba_val}"
-
-        draw.text((TEXT_AREA_X, info_y), ca_text, font=SMALL_FONT, fill=(10,10,10))
-        draw.text((TEXT_AREA_X + 110, info_y), ki_text, font=SMALL_FONT, fill=(10,10,10))
-        draw.text((TEXT_AREA_X, info_y + 18), bba_text, font=SMALL_FONT, fill=(10,10,10))
-
-        cards.append(card)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grid")
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+
+def _pack(img: Optional[Image.Image]):
+    # entre processos só passam bytes
+    if img is None:
+        return None
+    return img.mode, img.size, img.tobytes()
+
+
+def _unpack(img):
+    if img is None or isinstance(img, Image.Image):
+        return img
+    mode, size, data = img
+    return Image.frombytes(mode, size, data)
+
+
+# ============================================================
+# Formato de saída (configurável por guild)
+# ============================================================
+# png8: PNG com paleta de 256 cores — cores chapadas (barras de HP, texto) ficam exatas
+# e o arquivo sai ~3x menor que o PNG RGBA
+GRID_FORMATS = {"png": "png", "png8": "png", "webp": "webp", "jpeg": "jpg"}
+DEFAULT_GRID_FORMAT = "png8"
+DEFAULT_GRID_QUALITY = 80  # webp/jpeg
+
+
+def grid_filename(formato: str) -> str:
+    return f"grid.{GRID_FORMATS.get(formato, 'png')}"
+
+
+def encode_grid(grid: Image.Image, formato: str, qualidade: int) -> bytes:
+    buffer = io.BytesIO()
+    if formato == "png8":
+        grid.convert("RGB").quantize(256, method=Image.Quantize.FASTOCTREE).save(buffer, format="PNG")
+    elif formato == "webp":
+        grid.save(buffer, format="WEBP", quality=qualidade, method=4)
+    elif formato == "jpeg":
+        grid.convert("RGB").save(buffer, format="JPEG", quality=qualidade)
+    else:
+        grid.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_grid(mobs: List[dict], images: list, colunas: int,
+                formato: str = DEFAULT_GRID_FORMAT, qualidade: int = DEFAULT_GRID_QUALITY) -> bytes:
+    """Parte síncrona do gerar_grid: cards + montagem + codificação. Roda no executor."""
+    _pil()
+    cards = [get_card(mob, _unpack(img)) for mob, img in zip(mobs, images)]
 
     # montar grid
     total = len(cards)
@@ -131,7 +371,35 @@ async def gerar_grid(inimigos: dict, colunas: int = 3):
         grid.paste(card, (x, y), card)
 
     # exportar
-    buffer = io.BytesIO()
-    grid.save(buffer, format="PNG")
-    buffer.seek(0)
-    return buffer
+    return encode_grid(grid, formato, qualidade)
+
+
+async def gerar_grid(inimigos: dict, colunas: int = 3,
+                     formato: str = DEFAULT_GRID_FORMAT, qualidade: int = DEFAULT_GRID_QUALITY):
+    """
+    inimigos: dict { id: monster_data, ... }
+    Retorna BytesIO da imagem (formato em GRID_FORMATS; nome do anexo via grid_filename)
+    com grid estilo card (imagem à esquerda, texto à direita)
+    """
+    # coletar monstros (pular GRID_MSG se existir)
+    mobs = []
+    for k, v in inimigos.items():
+        if k == "GRID_MSG":
+            continue
+        mobs.append(v)
+
+    if not mobs:
+        return None
+
+    # baixar imagens em paralelo (uma vez por URL)
+    by_url = await fetch_images(mob.get("img") for mob in mobs)
+    images = [by_url.get(mob.get("img")) for mob in mobs]
+
+    # cards, montagem e PNG no executor (o loop segue atendendo as outras guilds)
+    mobs = [{f: mob.get(f) for f in CARD_FIELDS} for mob in mobs]
+    executor = get_executor()
+    if _use_processes:
+        images = [_pack(img) for img in images]
+    data = await asyncio.get_running_loop().run_in_executor(executor, render_grid, mobs, images, colunas,
+                                                             formato, qualidade)
+    return io.BytesIO(data)
@@ -0,0 +1,169 @@
+# utils/journal.py
+# Backend padrão das fichas: snapshot (players.json) + journal append-only.
+#
+# Cada mutação vira uma linha JSONL pequena, por exemplo:
+#   {"op": "set", "pid": "123", "field": "vida_atual", "delta": -5, "value": 21}
+#   {"op": "inv", "pid": "123", "item": "pele", "delta": 1, "qty": 3}
+#   {"op": "put", "pid": "123", "data": {...ficha completa...}}
+# Os registros guardam o valor final, então reaplicar uma linha é idempotente.
+import asyncio
+import json
+import os
+from typing import Dict, Any, Optional
+
+from utils.storage import load_json, write_json_atomic, snapshot_json, write_snapshot_atomic
+
+# compacta o journal no snapshot a cada COMPACT_INTERVAL segundos com mudanças
+COMPACT_INTERVAL = 60.0
+# ...ou antes disso, se ele passar de tantas linhas
+COMPACT_MAX_RECORDS = 5000
+
+
+def apply_record(players: Dict[str, Dict[str, Any]], rec: Dict[str, Any]):
+    op = rec.get("op")
+    pid = str(rec.get("pid"))
+    if op == "put":
+        players[pid] = rec["data"]
+        return
+    p = players.setdefault(pid, {})
+    if op == "set":
+        p[rec["field"]] = rec["value"]
+    elif op == "inv":
+        inv = p.setdefault("inventory", {})
+        if rec["qty"] > 0:
+            inv[rec["item"]] = rec["qty"]
+        else:
+            inv.pop(rec["item"], None)
+
+
+def replay(path: str, players: Dict[str, Dict[str, Any]]) -> int:
+    if not os.path.exists(path):
+        return 0
+    count = 0
+    with open(path, "r", encoding="utf8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                # última linha cortada por um crash no meio da escrita
+                continue
+            apply_record(players, rec)
+            count += 1
+    return count
+
+
+class JournalBackend:
+    """
+    Mutações são anexadas ao journal em vez de regravar o players.json.
+    Uma tarefa em segundo plano compacta o journal num snapshot novo;
+    na inicialização o snapshot é carregado e o journal é reaplicado por cima.
+    """
+
+    def __init__(self, snapshot_path: str, journal_path: str,
+                 compact_interval: float = COMPACT_INTERVAL,
+                 max_records: int = COMPACT_MAX_RECORDS):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        # journal que está sendo compactado (sobrevive a um crash no meio)
+        self.rotated_path = journal_path + ".old"
+        self.compact_interval = compact_interval
+        self.max_records = max_records
+        self._players: Dict[str, Dict[str, Any]] = {}
+        self._file = None
+        self._records = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._lock = asyncio.Lock()
+
+    # -------------------------
+    # leitura
+    # -------------------------
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        self._players = load_json(self.snapshot_path, {})
+        replay(self.rotated_path, self._players)
+        self._records = replay(self.journal_path, self._players)
+        if self._file is None:
+            self._file = open(self.journal_path, "a", encoding="utf8")
+        return self._players
+
+    # -------------------------
+    # escrita
+    # -------------------------
+    def _append(self, rec: Dict[str, Any]):
+        self._file.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._records += 1
+        self._schedule_compaction()
+
+    def write_player(self, pid: str, record: Dict[str, Any]):
+        self._append({"op": "put", "pid": pid, "data": record})
+
+    def write_field(self, pid: str, record: Dict[str, Any], field: str, delta=None):
+        self._append({"op": "set", "pid": pid, "field": field, "delta": delta, "value": record.get(field)})
+
+    def write_inventory(self, pid: str, item_key: str, qty: int, delta=None):
+        self._append({"op": "inv", "pid": pid, "item": item_key, "delta": delta, "qty": qty})
+
+    def write_all(self, players: Dict[str, Dict[str, Any]]):
+        # mudança em massa: vale mais um snapshot novo do que N linhas
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.compact_now()
+            return
+        asyncio.ensure_future(self.compact())
+
+    # -------------------------
+    # compactação
+    # -------------------------
+    def _schedule_compaction(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._records >= self.max_records:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = loop.call_soon(self._start_compaction)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.compact_interval, self._start_compaction)
+
+    def _start_compaction(self):
+        self._timer = None
+        asyncio.ensure_future(self.compact())
+
+    def _rotate(self):
+        # tudo o que vier depois daqui vai para um journal novo
+        self._file.close()
+        if os.path.exists(self.rotated_path):
+            # a compactação anterior falhou: junta os dois journals, em ordem
+            with open(self.journal_path, "r", encoding="utf8") as src, \
+                    open(self.rotated_path, "a", encoding="utf8") as dst:
+                dst.write(src.read())
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, self.rotated_path)
+        self._file = open(self.journal_path, "a", encoding="utf8")
+        self._records = 0
+
+    async def compact(self):
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._rotate()
+            try:
+                # snapshot compacto no loop; a formatação e a gravação vão para a thread
+                snapshot = snapshot_json(self._players)
+                await asyncio.to_thread(write_snapshot_atomic, self.snapshot_path, snapshot)
+            except Exception as e:
+                print(f"❌ Erro ao compactar {self.journal_path}: {e}")
+                return
+            os.remove(self.rotated_path)
+
+    def compact_now(self):
+        self._rotate()
+        write_json_atomic(self.snapshot_path, self._players)
+        os.remove(self.rotated_path)
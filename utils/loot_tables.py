@@ -0,0 +1,177 @@
+# utils/loot_tables.py
+# Tabelas de loot compiladas a partir de monsters.json (e XP de ranks_player.json).
+# A compilação roda uma vez por versão dos catálogos; gerar o loot de um monstro
+# morto é só percorrer a tabela já pronta.
+#
+# Formatos aceitos em "drops":
+#   {"item": "pele", "q": "1", "chance": 0.7}                       drop simples
+#   {"item": "esfera_bestial", "q": "1", "rolagem": "1d100", "minimo": 90}
+#                                                                   rolagem registrada no log
+#   {"um_de": [{"item": "a", "q": "1", "peso": 3}, {"item": "b", "peso": 1}], "chance": 0.5}
+#                                                                   sorteia um item pelo peso
+import random
+from typing import Dict, Any, List, Optional, Tuple
+
+from utils import catalogs
+from utils.dice import RollPlan, compile_dice
+from utils.autocomplete import normalize
+
+
+# ============================================================
+# Método de alias de Vose: sorteio ponderado em O(1)
+# ============================================================
+class AliasTable:
+    __slots__ = ("prob", "alias")
+
+    def __init__(self, weights: List[float]):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("Grupo de loot sem pesos positivos.")
+        scaled = [w * n / total for w in weights]
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in large + small:
+            # sobras (erro de arredondamento) ficam com probabilidade 1
+            self.prob[i] = 1.0
+
+    def sample(self) -> int:
+        i = random.randrange(len(self.prob))
+        return i if random.random() < self.prob[i] else self.alias[i]
+
+
+# ============================================================
+# Entradas compiladas
+# ============================================================
+def _plan(formula) -> Optional[RollPlan]:
+    try:
+        return compile_dice(str(formula if formula is not None else "1"))
+    except ValueError:
+        return None
+
+
+def _item_name(item_key: str) -> str:
+    info = catalogs.items.get(item_key) or {}
+    return info.get("nome") or item_key.replace("_", " ").title()
+
+
+class DropEntry:
+    __slots__ = ("item", "nome", "qty", "chance", "roll", "minimo")
+
+    def __init__(self, cfg: Dict[str, Any]):
+        self.item = cfg.get("item")
+        self.nome = _item_name(self.item)
+        self.qty = _plan(cfg.get("q", "1"))
+        self.chance = float(cfg.get("chance", 1.0))
+        # rolagem registrada (ex.: 1d100 >= 90) no lugar da chance
+        self.roll = _plan(cfg["rolagem"]) if cfg.get("rolagem") else None
+        self.minimo = int(cfg.get("minimo", 0))
+
+    def apply(self, results: Dict[str, Any]):
+        if self.roll is not None:
+            value = self.roll.roll()
+            won = value >= self.minimo
+            results["special_rolls"].append({
+                "item": self.item, "roll": value, "needed": self.minimo, "won": won,
+                "formula": self.roll.expression
+            })
+            if not won:
+                return
+            chance = None
+        else:
+            if random.random() > self.chance:
+                return
+            chance = self.chance
+        quant = self.qty.roll() if self.qty else 0
+        if quant > 0:
+            results["drops"].append({"item": self.item, "nome": self.nome, "quant": quant, "chance": chance})
+
+
+class DropGroup:
+    """Grupo "um_de": com a chance do grupo, sorteia exatamente uma opção pelo peso."""
+
+    __slots__ = ("options", "table", "chance")
+
+    def __init__(self, cfg: Dict[str, Any]):
+        options = [o for o in cfg.get("um_de", []) if o.get("item")]
+        self.options = [DropEntry(o) for o in options]
+        self.table = AliasTable([float(o.get("peso", 1)) for o in options])
+        self.chance = float(cfg.get("chance", 1.0))
+
+    def apply(self, results: Dict[str, Any]):
+        if random.random() > self.chance:
+            return
+        entry = self.options[self.table.sample()]
+        quant = entry.qty.roll() if entry.qty else 0
+        if quant > 0:
+            results["drops"].append({"item": entry.item, "nome": entry.nome, "quant": quant, "chance": self.chance})
+
+
+def compile_drops(drop_cfg) -> Tuple:
+    table = []
+    for d in drop_cfg or ():
+        try:
+            if d.get("um_de"):
+                table.append(DropGroup(d))
+            elif d.get("item"):
+                table.append(DropEntry(d))
+        except ValueError as e:
+            print(f"⚠️ Drop ignorado ({d}): {e}")
+    return tuple(table)
+
+
+# ============================================================
+# Registro das tabelas (recompilado quando um catálogo muda)
+# ============================================================
+class LootTables:
+    def __init__(self):
+        self._versions = None
+        self._tables: Dict[str, Tuple] = {}
+        self._by_name: Dict[str, str] = {}
+        self._xp: Dict[Tuple[str, str], int] = {}
+
+    def _refresh(self):
+        monsters = catalogs.monsters()
+        ranks_player = catalogs.ranks_player()
+        catalogs.items()
+        versions = (catalogs.monsters.version, catalogs.ranks_player.version, catalogs.items.version)
+        if versions == self._versions:
+            return
+        self._tables = {key: compile_drops(info.get("drops")) for key, info in monsters.items()}
+        # nome exibido e chave → chave (o snapshot do combate só guarda o nome)
+        self._by_name = {}
+        for key, info in monsters.items():
+            self._by_name.setdefault(normalize(info.get("nome", key)), key)
+        for key in monsters.keys():
+            self._by_name[normalize(key)] = key
+        self._xp = {
+            (normalize(rank), str(nivel)): int(entry.get("qi_xp", 0))
+            for rank, niveis in ranks_player.items() for nivel, entry in niveis.items()
+        }
+        self._versions = versions
+
+    def resolve(self, mon_key: str, nome: str = "") -> Optional[str]:
+        self._refresh()
+        return self._by_name.get(normalize(nome)) or self._by_name.get(normalize(mon_key))
+
+    def roll(self, mon_key: str, mon_data: Dict[str, Any]) -> Dict[str, Any]:
+        """XP, drops e rolagens especiais de um monstro morto."""
+        self._refresh()
+        rank = normalize(mon_data.get("rank", "bronze"))
+        nivel = str(mon_data.get("nivel", 1))
+        results = {"xp": self._xp.get((rank, nivel), 0), "drops": [], "special_rolls": []}
+        key = self.resolve(mon_key, mon_data.get("nome", ""))
+        for entry in self._tables.get(key, ()):
+            entry.apply(results)
+        return results
+
+
+loot_tables = LootTables()
@@ -0,0 +1,95 @@
+# utils/progression.py
+# Tabela de progressão montada a partir de ranks_player.json: o XP acumulado de
+# cada (rank, nível) numa lista ordenada, consultada com bisect. É refeita só
+# quando o catálogo recarrega (Catalog.version).
+import bisect
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+
+from utils import catalogs
+
+RANK_ORDER = ("bronze", "prata", "ouro", "ouro negro", "lendário")
+
+
+def _levels(niveis: Mapping[str, Any]) -> List[int]:
+    return sorted(int(lv) for lv in niveis.keys() if str(lv).isdigit())
+
+
+class ProgressionTable:
+    """
+    thresholds[i] = XP acumulado ao completar steps[i] = (rank, nível, stats),
+    percorrendo os ranks na ordem de RANK_ORDER.
+    Por rank também guarda os níveis e o XP acumulado dentro do rank
+    (usado pelos elementos e pelo "próximo threshold" da /ficha).
+    """
+
+    __slots__ = ("thresholds", "steps", "per_rank", "by_level")
+
+    def __init__(self, ranks_data: Mapping[str, Any]):
+        self.thresholds: List[int] = []
+        self.steps: List[Tuple[str, int, Mapping[str, Any]]] = []
+        self.per_rank: Dict[str, Tuple[List[int], List[int]]] = {}
+        self.by_level: Dict[Tuple[str, int], Mapping[str, Any]] = {}
+        total = 0
+        for rank, niveis in ranks_data.items():
+            levels = _levels(niveis)
+            cum, acc = [], 0
+            for lv in levels:
+                acc += int(niveis[str(lv)].get("qi_xp", 0))
+                cum.append(acc)
+                self.by_level[(rank, lv)] = niveis[str(lv)]
+            self.per_rank[rank] = (levels, cum)
+        for rank in RANK_ORDER:
+            if rank not in ranks_data:
+                continue
+            levels, _ = self.per_rank[rank]
+            for lv in levels:
+                stats = ranks_data[rank][str(lv)]
+                total += int(stats.get("qi_xp", 0))
+                self.thresholds.append(total)
+                self.steps.append((rank, lv, stats))
+
+    def level_for(self, xp: int) -> Optional[Tuple[str, int, Mapping[str, Any]]]:
+        """(rank, nível, stats) de quem tem `xp` de XP total; acima do último threshold fica no topo."""
+        if not self.steps:
+            return None
+        i = bisect.bisect_right(self.thresholds, int(xp))
+        return self.steps[min(i, len(self.steps) - 1)]
+
+    def stats_for(self, rank: str, level) -> Optional[Mapping[str, Any]]:
+        try:
+            return self.by_level.get((rank, int(level)))
+        except (TypeError, ValueError):
+            return None
+
+    def xp_needed(self, rank: str, level: int) -> int:
+        """XP acumulado dos níveis 1..level do rank."""
+        levels, cum = self.per_rank.get(rank, ((), ()))
+        i = bisect.bisect_right(levels, int(level))
+        return cum[i - 1] if i else 0
+
+    def level_in_rank(self, rank: str, xp: int) -> int:
+        """Nível dentro de um único rank (elementos não trocam de rank)."""
+        levels, cum = self.per_rank.get(rank, ((), ()))
+        if not levels:
+            return 1
+        i = bisect.bisect_right(cum, int(xp))
+        return levels[min(i, len(levels) - 1)]
+
+
+_table: Optional[ProgressionTable] = None
+_version = None
+
+
+def progression(ranks_data: Optional[Mapping[str, Any]] = None) -> ProgressionTable:
+    """
+    Tabela do catálogo ranks_player (em cache por versão).
+    Um ranks_data diferente do catálogo gera uma tabela avulsa, sem cache.
+    """
+    global _table, _version
+    current = catalogs.ranks_player()
+    if ranks_data is not None and ranks_data is not current:
+        return ProgressionTable(ranks_data)
+    if _table is None or _version != catalogs.ranks_player.version:
+        _table = ProgressionTable(current)
+        _version = catalogs.ranks_player.version
+    return _table
@@ -0,0 +1,210 @@
+# utils/simulator.py
+# Simulador Monte Carlo de encontros: roda milhares de combates de uma vez
+# (um array NumPy por grupo de combatentes) para calibrar rank/nível/quantidade.
+#
+# Regras (as mesmas do combate por turnos):
+#   - jogador: 1d20 + BBA + max(força, destreza) >= CA do monstro → dano da arma da mão direita
+#   - monstro: 1d20 + BBA >= CA do jogador → dano do rank, menos a absorção ("Levar Dano")
+#   - monstros atacam um jogador vivo ao acaso; o grupo concentra os ataques no primeiro monstro vivo
+#   - a cada rodada os jogadores agem primeiro, depois os monstros
+#
+# Uso manual:
+#   python -m utils.simulator bronze 3 --quantidade 4 --jogadores 3 --player-rank bronze --player-nivel 5 --arma espada_lunar
+from typing import Dict, Any, Optional
+
+from utils import catalogs
+from utils.dice import compile_dice
+
+DEFAULT_ENCOUNTERS = 10000
+MAX_ROUNDS = 50
+PERCENTILES = (10, 50, 90)
+
+# limites (o comando é aberto a qualquer membro): arrays de encontros × monstros e
+# um laço Python por monstro a cada rodada; ~0,6 µs por célula no pior caso (50 rodadas)
+MAX_ENCOUNTERS = 100000
+MAX_MONSTERS = 1000
+MAX_PLAYERS = 50
+MAX_CELLS = 5_000_000  # encontros × monstros × jogadores
+
+
+def check_limits(quantidade: int, jogadores: int, encontros: int):
+    """ValueError se a simulação passa dos limites (antes de alocar qualquer coisa)."""
+    if not 1 <= encontros <= MAX_ENCOUNTERS:
+        raise ValueError(f"Encontros deve estar entre 1 e {MAX_ENCOUNTERS}.")
+    if quantidade > MAX_MONSTERS:
+        raise ValueError(f"No máximo {MAX_MONSTERS} monstros por simulação.")
+    if jogadores > MAX_PLAYERS:
+        raise ValueError(f"No máximo {MAX_PLAYERS} jogadores por simulação.")
+    if encontros * quantidade * jogadores > MAX_CELLS:
+        raise ValueError(f"Simulação grande demais: encontros × monstros × jogadores passa de {MAX_CELLS}; "
+                         f"reduza os encontros.")
+
+
+def build_encounter(rank: str, nivel: str, quantidade: int = 1, jogadores: int = 1,
+                    player_rank: str = "bronze", player_nivel: str = "1", arma: Optional[str] = None,
+                    bba: int = 0, atributo: int = 0, ca: int = 10, absorv: int = 0) -> Dict[str, Any]:
+    """Monta os parâmetros do encontro a partir de ranks.json, ranks_player.json e equipamentos.json."""
+    ranks = catalogs.ranks()
+    ranks_player = catalogs.ranks_player()
+    if rank not in ranks or str(nivel) not in ranks[rank]:
+        raise ValueError(f"Rank/nível de monstro inválido: {rank} {nivel}")
+    if player_rank not in ranks_player or str(player_nivel) not in ranks_player[player_rank]:
+        raise ValueError(f"Rank/nível de jogador inválido: {player_rank} {player_nivel}")
+    if quantidade < 1 or jogadores < 1:
+        raise ValueError("Quantidade de monstros e jogadores deve ser pelo menos 1.")
+
+    mon = ranks[rank][str(nivel)]
+    ply = ranks_player[player_rank][str(player_nivel)]
+    weapon = catalogs.equipamentos().get(arma, {}) if arma else {}
+    if arma and not weapon:
+        raise ValueError(f"Arma não encontrada: {arma}")
+
+    return {
+        "quantidade": int(quantidade),
+        "monster_vida": int(mon["vida"]),
+        "monster_ca": int(mon["ca"]),
+        "monster_bba": int(mon.get("bba", 0)),
+        "monster_dano": mon.get("dano", "1d4"),
+        "jogadores": int(jogadores),
+        "player_hp": int(ply["hp"]),
+        "player_qi": int(ply.get("qi", 0)),
+        "player_ataque": int(bba) + int(atributo),
+        "player_ca": int(ca),
+        "player_absorv": int(absorv),
+        "player_dano": weapon.get("dano") or "1d4",
+    }
+
+
+def simulate(enc: Dict[str, Any], encontros: int = DEFAULT_ENCOUNTERS,
+             max_rounds: int = MAX_ROUNDS) -> Dict[str, Any]:
+    """Roda `encontros` combates em paralelo e devolve as estatísticas."""
+    check_limits(enc["quantidade"], enc["jogadores"], int(encontros))
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError("O simulador precisa do NumPy instalado.")
+    rng = np.random.default_rng()
+    n = int(encontros)
+    q = enc["quantidade"]
+    P = enc["jogadores"]
+    player_plan = compile_dice(enc["player_dano"])
+    monster_plan = compile_dice(enc["monster_dano"])
+
+    # o grupo mata os monstros em ordem, então basta guardar o índice do alvo
+    # atual e a vida dele (os monstros seguintes estão intactos)
+    alvo = np.zeros(n, dtype=np.int64)
+    alvo_hp = np.full(n, enc["monster_vida"], dtype=np.int64)
+    ply_hp = np.full((n, P), enc["player_hp"], dtype=np.int64)
+    dano_sofrido = np.zeros(n, dtype=np.int64)
+    # só os encontros ainda em andamento ficam nos arrays; `ids` aponta para a linha original
+    ids = np.arange(n)
+    rodadas = np.full(n, max_rounds, dtype=np.int64)
+    vitoria = np.zeros(n, dtype=bool)
+    derrota = np.zeros(n, dtype=bool)
+    final_hp = np.zeros((n, P), dtype=np.int64)
+    final_dano = np.zeros(n, dtype=np.int64)
+
+    for r in range(1, max_rounds + 1):
+        k = ids.size
+        rows = np.arange(k)
+
+        # ---- jogadores ----
+        d20 = rng.integers(1, 21, (k, P))
+        dano = player_plan.roll_batch(k * P).reshape(k, P)
+        hit = (d20 + enc["player_ataque"] >= enc["monster_ca"]) & (ply_hp > 0)
+        for p in range(P):
+            alvo_hp -= np.where(hit[:, p] & (alvo < q), dano[:, p], 0)
+            morreu = alvo_hp <= 0
+            alvo[morreu] += 1
+            alvo_hp[morreu] = enc["monster_vida"]
+        venceu = alvo >= q
+
+        # ---- monstros ----
+        d20 = rng.integers(1, 21, (k, q))
+        dano = np.maximum(0, monster_plan.roll_batch(k * q).reshape(k, q) - enc["player_absorv"])
+        hit = (d20 + enc["monster_bba"] >= enc["player_ca"]) & ~venceu[:, None]
+        for m in range(q):
+            vivos = ply_hp > 0
+            atk = hit[:, m] & (alvo <= m) & vivos.any(axis=1)
+            if not atk.any():
+                continue
+            # jogador vivo ao acaso: maior chave aleatória entre os vivos
+            tgt = np.where(vivos, rng.random((k, P)), -1.0).argmax(axis=1)
+            d = np.where(atk, np.minimum(dano[:, m], ply_hp[rows, tgt]), 0)
+            ply_hp[rows, tgt] -= d
+            dano_sofrido += d
+        perdeu = ~venceu & ~(ply_hp > 0).any(axis=1)
+
+        fim = venceu | perdeu
+        if fim.any():
+            done = ids[fim]
+            vitoria[done] = venceu[fim]
+            derrota[done] = perdeu[fim]
+            rodadas[done] = r
+            final_hp[done] = ply_hp[fim]
+            final_dano[done] = dano_sofrido[fim]
+            keep = ~fim
+            ids, alvo, alvo_hp = ids[keep], alvo[keep], alvo_hp[keep]
+            ply_hp, dano_sofrido = ply_hp[keep], dano_sofrido[keep]
+        if not ids.size:
+            break
+
+    final_hp[ids] = ply_hp
+    final_dano[ids] = dano_sofrido
+    vit_rodadas = rodadas[vitoria]
+    return {
+        "encontros": n,
+        "vitoria": float(vitoria.mean()),
+        "derrota": float(derrota.mean()),
+        "empate": float(ids.size / n),
+        "rodadas": {q_: int(np.percentile(vit_rodadas, q_)) for q_ in PERCENTILES} if vit_rodadas.size else {},
+        "rodadas_media": float(vit_rodadas.mean()) if vit_rodadas.size else None,
+        "dano_sofrido": {q_: int(np.percentile(final_dano, q_)) for q_ in PERCENTILES},
+        "mortes_media": float((final_hp <= 0).sum(axis=1).mean()),
+    }
+
+
+def format_report(enc: Dict[str, Any], res: Dict[str, Any]) -> str:
+    linhas = [
+        f"{enc['quantidade']}x monstro (vida {enc['monster_vida']}, CA {enc['monster_ca']}, "
+        f"BBA {enc['monster_bba']}, dano {enc['monster_dano']}) vs "
+        f"{enc['jogadores']} jogador(es) (hp {enc['player_hp']}, CA {enc['player_ca']}, "
+        f"ataque +{enc['player_ataque']}, dano {enc['player_dano']})",
+        f"Encontros: {res['encontros']}",
+        f"Vitória: {res['vitoria'] * 100:.1f}% | Derrota: {res['derrota'] * 100:.1f}% | "
+        f"Sem fim em {MAX_ROUNDS} rodadas: {res['empate'] * 100:.1f}%",
+    ]
+    if res["rodadas"]:
+        linhas.append("Rodadas até vencer: média {:.1f} | ".format(res["rodadas_media"])
+                      + " | ".join(f"p{k}: {v}" for k, v in res["rodadas"].items()))
+    linhas.append("Dano sofrido pelo grupo: " + " | ".join(f"p{k}: {v}" for k, v in res["dano_sofrido"].items()))
+    linhas.append(f"Jogadores caídos (média): {res['mortes_media']:.2f}")
+    return "\n".join(linhas)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    ap = argparse.ArgumentParser(description="Simula encontros em lote para balancear o /combate_iniciar.")
+    ap.add_argument("rank")
+    ap.add_argument("nivel")
+    ap.add_argument("--quantidade", type=int, default=1)
+    ap.add_argument("--jogadores", type=int, default=1)
+    ap.add_argument("--player-rank", default="bronze")
+    ap.add_argument("--player-nivel", default="1")
+    ap.add_argument("--arma", default=None, help="chave em equipamentos.json")
+    ap.add_argument("--bba", type=int, default=0)
+    ap.add_argument("--atributo", type=int, default=0, help="max(força, destreza)")
+    ap.add_argument("--ca", type=int, default=10)
+    ap.add_argument("--absorv", type=int, default=0)
+    ap.add_argument("--encontros", type=int, default=DEFAULT_ENCOUNTERS)
+    args = ap.parse_args()
+
+    encounter = build_encounter(args.rank, args.nivel, args.quantidade, args.jogadores,
+                                args.player_rank, args.player_nivel, args.arma,
+                                args.bba, args.atributo, args.ca, args.absorv)
+    t0 = time.perf_counter()
+    result = simulate(encounter, args.encontros)
+    print(format_report(encounter, result))
+    print(f"({time.perf_counter() - t0:.3f}s)")
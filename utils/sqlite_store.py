@@ -0,0 +1,169 @@
+# utils/sqlite_store.py
+# Backend SQLite opcional para as fichas (PLAYER_BACKEND=sqlite no .env)
+#
+# Uso manual:
+#   python -m utils.sqlite_store migrar  [players.json] [players.db]
+#   python -m utils.sqlite_store exportar [players.db] [saida.json]
+import json
+import os
+import sqlite3
+import sys
+from typing import Dict, Any
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id   TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS inventory (
+    player_id TEXT NOT NULL,
+    item_key  TEXT NOT NULL,
+    qty       INTEGER NOT NULL,
+    PRIMARY KEY (player_id, item_key)
+);
+CREATE TABLE IF NOT EXISTS equip (
+    player_id TEXT NOT NULL,
+    slot      TEXT NOT NULL,
+    item_key  TEXT,
+    PRIMARY KEY (player_id, slot)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# campos que vivem em tabelas próprias (o resto da ficha vai em players.data)
+SPLIT_FIELDS = ("inventory", "equip")
+
+
+def _core(record: Dict[str, Any]) -> str:
+    core = {k: v for k, v in record.items() if k not in SPLIT_FIELDS}
+    return json.dumps(core, ensure_ascii=False)
+
+
+class SqliteBackend:
+    """
+    Uma linha por jogador em `players` e uma linha por item/slot em
+    `inventory`/`equip`: comprar, vender ou tomar dano grava só o que mudou.
+    """
+
+    def __init__(self, path: str, migrate_from: str = None):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        if migrate_from:
+            self.migrate_from_json(migrate_from)
+
+    # -------------------------
+    # leitura
+    # -------------------------
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        players = {}
+        for pid, data in self.conn.execute("SELECT id, data FROM players"):
+            players[pid] = json.loads(data)
+        for pid, item_key, qty in self.conn.execute("SELECT player_id, item_key, qty FROM inventory"):
+            if pid in players:
+                players[pid].setdefault("inventory", {})[item_key] = qty
+        for pid, slot, item_key in self.conn.execute("SELECT player_id, slot, item_key FROM equip"):
+            if pid in players:
+                players[pid].setdefault("equip", {})[slot] = item_key
+        return players
+
+    # -------------------------
+    # escrita
+    # -------------------------
+    def _put_player(self, pid: str, record: Dict[str, Any]):
+        self.conn.execute(
+            "INSERT INTO players (id, data) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+            (pid, _core(record))
+        )
+        self.conn.execute("DELETE FROM inventory WHERE player_id = ?", (pid,))
+        self.conn.executemany(
+            "INSERT INTO inventory (player_id, item_key, qty) VALUES (?, ?, ?)",
+            [(pid, k, int(q)) for k, q in (record.get("inventory") or {}).items()]
+        )
+        self.conn.execute("DELETE FROM equip WHERE player_id = ?", (pid,))
+        self.conn.executemany(
+            "INSERT INTO equip (player_id, slot, item_key) VALUES (?, ?, ?)",
+            [(pid, s, k) for s, k in (record.get("equip") or {}).items()]
+        )
+
+    def write_player(self, pid: str, record: Dict[str, Any]):
+        with self.conn:
+            self._put_player(pid, record)
+
+    def write_core(self, pid: str, record: Dict[str, Any]):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO players (id, data) VALUES (?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+                (pid, _core(record))
+            )
+
+    def write_field(self, pid: str, record: Dict[str, Any], field: str, delta=None):
+        # os campos simples moram no JSON da linha do jogador
+        self.write_core(pid, record)
+
+    def write_inventory(self, pid: str, item_key: str, qty: int, delta=None):
+        with self.conn:
+            if qty > 0:
+                self.conn.execute(
+                    "INSERT INTO inventory (player_id, item_key, qty) VALUES (?, ?, ?) "
+                    "ON CONFLICT(player_id, item_key) DO UPDATE SET qty = excluded.qty",
+                    (pid, item_key, int(qty))
+                )
+            else:
+                self.conn.execute(
+                    "DELETE FROM inventory WHERE player_id = ? AND item_key = ?",
+                    (pid, item_key)
+                )
+
+    def write_all(self, players: Dict[str, Dict[str, Any]]):
+        with self.conn:
+            for pid, record in players.items():
+                self._put_player(pid, record)
+
+    # -------------------------
+    # migração / exportação
+    # -------------------------
+    def migrate_from_json(self, json_path: str) -> int:
+        # roda uma única vez: depois disso o banco é a fonte da verdade
+        done = self.conn.execute("SELECT value FROM meta WHERE key = 'migrated_from_json'").fetchone()
+        if done or not os.path.exists(json_path):
+            return 0
+        with open(json_path, "r", encoding="utf8") as f:
+            players = json.load(f)
+        with self.conn:
+            for pid, record in players.items():
+                self._put_player(str(pid), record)
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_from_json', ?)",
+                (os.path.abspath(json_path),)
+            )
+        return len(players)
+
+    def export_json(self, json_path: str) -> int:
+        from utils.storage import write_json_atomic
+        players = self.load_all()
+        write_json_atomic(json_path, players)
+        return len(players)
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ""
+    if cmd == "migrar":
+        src = sys.argv[2] if len(sys.argv) > 2 else "./data/players.json"
+        db = sys.argv[3] if len(sys.argv) > 3 else "./data/players.db"
+        n = SqliteBackend(db).migrate_from_json(src)
+        print(f"📦 {n} fichas migradas de {src} para {db}.")
+    elif cmd == "exportar":
+        db = sys.argv[2] if len(sys.argv) > 2 else "./data/players.db"
+        out = sys.argv[3] if len(sys.argv) > 3 else "./data/players_export.json"
+        n = SqliteBackend(db).export_json(out)
+        print(f"📤 {n} fichas exportadas para {out}.")
+    else:
+        print("Uso: python -m utils.sqlite_store [migrar|exportar] [origem] [destino]")
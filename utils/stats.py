@@ -0,0 +1,136 @@
+# utils/stats.py
+# Atributos derivados da ficha: CA, absorção, vida/QI máximos e atributos totais.
+#
+# Base (o que fica na ficha):   rank/nível (→ hp/qi de ranks_player.json), "atributos",
+#                               "ca_base", "equip", "buffs"
+# Derivado (calculado aqui):    base + bônus dos equipamentos (+ buffs de CA)
+#
+# Os derivados de cada ficha ficam em cache e só são recalculados quando alguém
+# chama invalidate()/refresh_player() (equipar, desequipar, buff, mudança de nível)
+# ou quando o catálogo de equipamentos/ranks recarrega.
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Tuple
+
+from utils import catalogs
+from utils.progression import progression
+
+ATTR_BONUS = ("forca", "destreza", "constituicao", "sabedoria")
+STATS_CACHE_SIZE = 1024
+
+
+class DerivedStats:
+    __slots__ = ("vida_max", "mana_max", "ca", "ca_equip", "absorv", "atributos")
+
+    def __init__(self, vida_max: int, mana_max: int, ca: int, ca_equip: int, absorv: int,
+                 atributos: Mapping[str, int]):
+        self.vida_max = vida_max
+        self.mana_max = mana_max
+        self.ca = ca
+        self.ca_equip = ca_equip
+        self.absorv = absorv
+        self.atributos = atributos
+
+    def attr(self, name: str) -> int:
+        return self.atributos.get(name, 0)
+
+
+def base_maxima(player: Dict[str, Any]) -> Tuple[int, int]:
+    """Vida e QI máximos sem equipamento: os do rank/nível; sem rank conhecido, os guardados na ficha."""
+    stats = progression().stats_for(player.get("rank", "bronze"), player.get("nivel", 1))
+    if stats is not None:
+        return int(stats.get("hp", 0)), int(stats.get("qi", 0))
+    return (int(player.get("vida_base", player.get("vida_max", 0))),
+            int(player.get("mana_base", player.get("mana_max", 0))))
+
+
+def compute_stats(player: Dict[str, Any]) -> DerivedStats:
+    """Calcula os derivados sem tocar na ficha nem no cache."""
+    vida_max, mana_max = base_maxima(player)
+    ca_equip = absorv = 0
+    atributos = {k: int(v) for k, v in (player.get("atributos") or {}).items()}
+    equip_db = catalogs.equipamentos()
+    for key in (player.get("equip") or {}).values():
+        if not key:
+            continue
+        info = equip_db.get(key, {})
+        vida_max += int(info.get("hp_bonus", 0))
+        mana_max += int(info.get("mana_bonus", 0))
+        ca_equip += int(info.get("ca_bonus", 0))
+        absorv += int(info.get("absorv", 0))
+        for attr in ATTR_BONUS:
+            if info.get(f"{attr}_bonus"):
+                atributos[attr] = atributos.get(attr, 0) + int(info[f"{attr}_bonus"])
+    buffs = sum(int(b.get("ca_mod", 0)) for b in player.get("buffs") or ())
+    ca = int(player.get("ca_base", 10)) + ca_equip + buffs
+    return DerivedStats(vida_max, mana_max, ca, ca_equip, absorv, MappingProxyType(atributos))
+
+
+# ============================================================
+# Cache por ficha (as fichas do PlayerStore são objetos vivos)
+# ============================================================
+class StatsCache:
+    def __init__(self, maxsize: int = STATS_CACHE_SIZE):
+        # id(ficha) -> (ficha, versões dos catálogos, derivados); a referência à
+        # ficha impede que o id seja reaproveitado por outro objeto.
+        # LRU limitado: fichas que saíram do PlayerStore acabam descartadas
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[int, Tuple[Dict[str, Any], Tuple[int, int], DerivedStats]]" = OrderedDict()
+
+    @staticmethod
+    def _versions() -> Tuple[int, int]:
+        return catalogs.equipamentos.version, catalogs.ranks_player.version
+
+    def get(self, player: Dict[str, Any]) -> DerivedStats:
+        entry = self._entries.get(id(player))
+        versions = self._versions()
+        if entry is not None and entry[0] is player and entry[1] == versions:
+            self._entries.move_to_end(id(player))
+            return entry[2]
+        stats = compute_stats(player)
+        # compute_stats pode ter recarregado um catálogo
+        self._entries[id(player)] = (player, self._versions(), stats)
+        self._entries.move_to_end(id(player))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return stats
+
+    def invalidate(self, player: Dict[str, Any]):
+        self._entries.pop(id(player), None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+stats_cache = StatsCache()
+
+
+def player_stats(player: Dict[str, Any]) -> DerivedStats:
+    return stats_cache.get(player)
+
+
+def refresh_player(player: Dict[str, Any]) -> DerivedStats:
+    """
+    Recalcula os derivados e grava na ficha os campos que o resto do bot exibe
+    (vida_max, mana_max, ca_bonus, absorv), mantendo a proporção de vida/QI atuais.
+    Os atributos base não são alterados. Não entra no cache (a ficha pode ser uma
+    cópia temporária, como na /ficha): o próximo player_stats() recalcula.
+    """
+    stats_cache.invalidate(player)
+    if progression().stats_for(player.get("rank", "bronze"), player.get("nivel", 1)) is None:
+        # sem rank na tabela: guarda a base uma vez para os bônus não se acumularem
+        player.setdefault("vida_base", int(player.get("vida_max", 0)))
+        player.setdefault("mana_base", int(player.get("mana_max", 0)))
+    stats = compute_stats(player)
+    for max_key, cur_key, new_max in (("vida_max", "vida_atual", stats.vida_max),
+                                      ("mana_max", "mana_atual", stats.mana_max)):
+        old_max = int(player.get(max_key, 0))
+        old_cur = int(player.get(cur_key, old_max))
+        player[max_key] = new_max
+        if old_max > 0:
+            player[cur_key] = min(new_max, max(0, int(old_cur * (new_max / old_max))))
+        else:
+            player[cur_key] = new_max
+    player["ca_bonus"] = stats.ca_equip
+    player["absorv"] = stats.absorv
+    return stats
@@ -0,0 +1,323 @@
+# utils/storage.py
+import asyncio
+import atexit
+import json
+import os
+import tempfile
+from typing import Dict, Any, Optional, Callable
+
+PLAYERS_PATH = "./data/players.json"
+PLAYERS_DB_PATH = "./data/players.db"
+PLAYERS_JOURNAL_PATH = "./data/players.journal.jsonl"
+
+# intervalo (s) em que as gravações pendentes são agrupadas num único flush
+FLUSH_INTERVAL = 2.0
+
+
+# ============================================================
+# Gravação atômica (arquivo temporário + rename)
+# ============================================================
+def dumps_json(data) -> str:
+    return json.dumps(data, indent=4, ensure_ascii=False)
+
+
+def snapshot_json(data) -> str:
+    # no loop: cópia consistente e barata (sem indent o json usa o encoder em C);
+    # a formatação com indent fica para a thread (write_snapshot_atomic)
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _default_mode() -> int:
+    # os.umask só pode ser lido trocando o valor; feito uma vez, na importação
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+_DEFAULT_MODE = _default_mode()
+
+
+def write_text_atomic(path: str, text: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        # mkstemp cria com 0600: mantém o modo do arquivo atual (ou o padrão do umask)
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except OSError:
+            mode = _DEFAULT_MODE
+        os.chmod(tmp_path, mode)
+        with os.fdopen(fd, "w", encoding="utf8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_atomic(path: str, data):
+    write_text_atomic(path, dumps_json(data))
+
+
+def write_snapshot_atomic(path: str, snapshot: str):
+    """Grava um texto de snapshot_json() formatado (roda na thread de gravação)."""
+    write_text_atomic(path, dumps_json(json.loads(snapshot)))
+
+
+# ============================================================
+# JsonWriter - marca arquivos sujos e grava em lote fora do loop
+# ============================================================
+class JsonWriter:
+    """
+    save_json() só registra o conteúdo mais recente de cada arquivo.
+    Um flush por intervalo tira um snapshot compacto no loop (consistente e barato)
+    e formata/grava numa thread de forma atômica, então várias mudanças seguidas
+    custam uma única serialização e uma única escrita em disco.
+    """
+
+    def __init__(self, interval: float = FLUSH_INTERVAL):
+        self.interval = interval
+        self._pending: Dict[str, Any] = {}
+        self._writing: Dict[str, Any] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._lock = asyncio.Lock()
+
+    def schedule(self, path: str, data):
+        self._pending[os.path.abspath(path)] = data
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # fora do loop (scripts, encerramento): grava na hora
+            self.flush_now()
+            return
+        if self._timer is None:
+            self._timer = loop.call_later(self.interval, self._start_flush)
+
+    def pending(self, path: str):
+        # conteúdo ainda não gravado (garante que quem salvou leia o próprio dado)
+        key = os.path.abspath(path)
+        if key in self._pending:
+            return self._pending[key]
+        return self._writing.get(key)
+
+    def _start_flush(self):
+        self._timer = None
+        asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            batch, self._pending = self._pending, {}
+            self._writing = batch
+            failed = {}
+            try:
+                for path, data in batch.items():
+                    try:
+                        snapshot = snapshot_json(data)
+                        await asyncio.to_thread(write_snapshot_atomic, path, snapshot)
+                    except Exception as e:
+                        print(f"❌ Erro ao salvar {path}: {e}")
+                        failed[path] = data
+            finally:
+                self._writing = {}
+            for path, data in failed.items():
+                self.schedule(path, self._pending.get(path, data))
+
+    def flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        for path, data in batch.items():
+            write_json_atomic(path, data)
+
+
+json_writer = JsonWriter()
+atexit.register(json_writer.flush_now)
+
+
+# ============================================================
+# Helpers JSON (data/*.json)
+# ============================================================
+def load_json(path: str, default=None):
+    if default is None:
+        default = {}
+    pending = json_writer.pending(path)
+    if pending is not None:
+        return pending
+    if not os.path.exists(path):
+        write_json_atomic(path, default)
+        return default
+    with open(path, "r", encoding="utf8") as f:
+        return json.load(f)
+
+
+def save_json(path: str, data):
+    json_writer.schedule(path, data)
+
+
+# ============================================================
+# Backends das fichas
+# ============================================================
+class JsonBackend:
+    """players.json inteiro; qualquer mudança agenda a regravação do arquivo (PLAYER_BACKEND=json)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._players: Dict[str, Dict[str, Any]] = {}
+
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        self._players = load_json(self.path, {})
+        return self._players
+
+    def _touch(self, *args):
+        save_json(self.path, self._players)
+
+    write_player = _touch
+    write_field = _touch
+    write_inventory = _touch
+    write_all = _touch
+
+
+def make_player_backend():
+    # lido só no primeiro acesso, depois que o main.py carregou o .env
+    backend = os.getenv("PLAYER_BACKEND", "journal").lower()
+    if backend == "sqlite":
+        from utils.sqlite_store import SqliteBackend
+        return SqliteBackend(os.getenv("PLAYERS_DB_PATH", PLAYERS_DB_PATH), migrate_from=PLAYERS_PATH)
+    if backend == "json":
+        return JsonBackend(PLAYERS_PATH)
+    from utils.journal import JournalBackend
+    return JournalBackend(PLAYERS_PATH, PLAYERS_JOURNAL_PATH)
+
+
+# ============================================================
+# PlayerStore - fichas em memória (uma instância por processo)
+# ============================================================
+class PlayerStore:
+    """
+    Carrega as fichas uma única vez e serve as leituras da memória.
+    Os registros entregues são os objetos vivos: altere-os e chame save(pid),
+    ou use os helpers (add_item, add_coins, change_hp...) que gravam só o campo alterado.
+    """
+
+    def __init__(self, backend_factory: Callable[[], Any] = make_player_backend):
+        self._backend_factory = backend_factory
+        self._backend = None
+        self._players: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._players is None:
+            if self._backend is None:
+                self._backend = self._backend_factory()
+            self._players = self._backend.load_all()
+        return self._players
+
+    @property
+    def backend(self):
+        self._load()
+        return self._backend
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        return self._load()
+
+    def get(self, player_id) -> Optional[Dict[str, Any]]:
+        return self._load().get(str(player_id))
+
+    def __contains__(self, player_id) -> bool:
+        return str(player_id) in self._load()
+
+    def put(self, player_id, record: Dict[str, Any]) -> Dict[str, Any]:
+        self._load()[str(player_id)] = record
+        return record
+
+    def get_or_create(self, player_id, factory: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        players = self._load()
+        key = str(player_id)
+        if key not in players:
+            players[key] = factory()
+        return players[key]
+
+    def save(self, player_id=None):
+        # com player_id grava só aquela ficha; sem, grava todas
+        players = self._load()
+        if player_id is None:
+            self._backend.write_all(players)
+        else:
+            key = str(player_id)
+            self._backend.write_player(key, players[key])
+
+    def reload(self):
+        # descarta o cache; a próxima leitura volta ao disco
+        self._players = None
+
+    # -------------------------
+    # mutações de um campo só
+    # -------------------------
+    def add_item(self, player_id, item_key: str, qty: int) -> int:
+        key = str(player_id)
+        inv = self._load()[key].setdefault("inventory", {})
+        new_qty = int(inv.get(item_key, 0)) + int(qty)
+        if new_qty > 0:
+            inv[item_key] = new_qty
+        else:
+            inv.pop(item_key, None)
+        self._backend.write_inventory(key, item_key, new_qty, int(qty))
+        return new_qty
+
+    def add_coins(self, player_id, delta: int) -> int:
+        key = str(player_id)
+        p = self._load()[key]
+        p["coins"] = int(p.get("coins", 0)) + int(delta)
+        self._backend.write_field(key, p, "coins", int(delta))
+        return p["coins"]
+
+    def set_coins(self, player_id, value: int) -> int:
+        key = str(player_id)
+        p = self._load()[key]
+        delta = int(value) - int(p.get("coins", 0))
+        p["coins"] = int(value)
+        self._backend.write_field(key, p, "coins", delta)
+        return p["coins"]
+
+    def change_hp(self, player_id, delta: int) -> int:
+        key = str(player_id)
+        p = self._load()[key]
+        before = int(p.get("vida_atual", 0))
+        hp = before + int(delta)
+        p["vida_atual"] = max(0, min(int(p.get("vida_max", hp)), hp))
+        self._backend.write_field(key, p, "vida_atual", p["vida_atual"] - before)
+        return p["vida_atual"]
+
+    def change_mana(self, player_id, delta: int) -> int:
+        key = str(player_id)
+        p = self._load()[key]
+        before = int(p.get("mana_atual", 0))
+        qi = before + int(delta)
+        p["mana_atual"] = max(0, min(int(p.get("mana_max", qi)), qi))
+        self._backend.write_field(key, p, "mana_atual", p["mana_atual"] - before)
+        return p["mana_atual"]
+
+    def set_field(self, player_id, field: str, value):
+        key = str(player_id)
+        p = self._load()[key]
+        p[field] = value
+        self._backend.write_field(key, p, field)
+        return value
+
+    def add_xp(self, player_id, amount: int, field: str = "xp_total") -> int:
+        key = str(player_id)
+        p = self._load()[key]
+        p[field] = int(p.get(field, 0)) + int(amount)
+        self._backend.write_field(key, p, field, int(amount))
+        return p[field]
+
+
+player_store = PlayerStore()